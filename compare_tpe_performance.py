@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""Compare Optuna (Python) and optuna-tpe-js performance on the golden scenarios.
+
+Every scenario/trial-count/seed case runs in a fresh process on each side, so
+peak RSS is per case. Ask latency is measured per trial: study.ask() plus the
+sampler work that suggest_*() triggers (relative and independent sampling).
+
+Usage:
+  python compare_tpe_performance.py
+  python compare_tpe_performance.py --scenario core_single_objective --trials 50,100,200,400
+"""
+
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+ROOT = os.path.abspath(os.path.dirname(__file__))
+JS_BENCH_PATH = os.path.join(ROOT, "tpeCore.bench.js")
+REPORT_DIR = os.path.join(ROOT, "perf-report")
+DEFAULT_TRIAL_COUNTS = [25, 50, 100, 200]
+TIMED_SAMPLER_METHODS = ["infer_relative_search_space", "sample_relative", "sample_independent"]
+
+
+def summarize_latencies(samples: List[float]) -> Dict[str, Any]:
+    if not samples:
+        return {"count": 0, "meanMs": None, "p50Ms": None, "p95Ms": None, "maxMs": None, "totalMs": 0.0}
+    ordered = sorted(samples)
+    total = sum(ordered)
+
+    def pick(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    return {
+        "count": len(ordered),
+        "meanMs": total / len(ordered),
+        "p50Ms": pick(0.5),
+        "p95Ms": pick(0.95),
+        "maxMs": ordered[-1],
+        "totalMs": total,
+    }
+
+
+def peak_rss_bytes() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def instrument_trial_latency(latencies: Dict[int, float]) -> Callable[[], None]:
+    import optuna
+    from optuna.samplers import TPESampler
+
+    depth = [0]
+
+    def timed(fn: Callable[..., Any], trial_number_of: Callable[[tuple, Any], int]) -> Callable[..., Any]:
+        def timed_call(*args: Any, **kwargs: Any) -> Any:
+            if depth[0] > 0:
+                return fn(*args, **kwargs)
+            depth[0] += 1
+            start = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+            finally:
+                depth[0] -= 1
+            number = trial_number_of(args, result)
+            latencies[number] = latencies.get(number, 0.0) + (time.perf_counter() - start) * 1000.0
+            return result
+
+        return timed_call
+
+    originals = [(optuna.study.Study, "ask", optuna.study.Study.ask)]
+    optuna.study.Study.ask = timed(optuna.study.Study.ask, lambda _args, trial: trial.number)
+    for method in TIMED_SAMPLER_METHODS:
+        original = getattr(TPESampler, method)
+        originals.append((TPESampler, method, original))
+        setattr(TPESampler, method, timed(original, lambda args, _result: args[2].number))
+
+    def restore() -> None:
+        for target, method, original in originals:
+            setattr(target, method, original)
+
+    return restore
+
+
+def bench_python_scenario(name: str, n_trials: int, seed: int) -> Dict[str, Any]:
+    import optuna
+
+    import generate_tpe_golden
+
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+    spec = dataclasses.replace(generate_tpe_golden.SCENARIOS_BY_NAME[name], n_trials=n_trials)
+    latencies: Dict[int, float] = {}
+    restore = instrument_trial_latency(latencies)
+
+    baseline_rss = peak_rss_bytes()
+    start = time.perf_counter()
+    try:
+        records = spec.run(seed)
+    finally:
+        restore()
+    wall_ms = (time.perf_counter() - start) * 1000.0
+
+    return {
+        "implementation": "python",
+        "runtime": f"python {sys.version.split()[0]}, optuna {getattr(optuna, '__version__', 'unknown')}",
+        "scenario": name,
+        "nTrials": n_trials,
+        "seed": seed,
+        "tellLag": spec.tell_lag,
+        "completedTrials": len(records),
+        "wallMs": wall_ms,
+        "ask": summarize_latencies(list(latencies.values())),
+        "baselineRssBytes": baseline_rss,
+        "peakRssBytes": peak_rss_bytes(),
+    }
+
+
+def run_worker(command: List[str]) -> Dict[str, Any]:
+    completed = subprocess.run(command, cwd=ROOT, capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f"Benchmark worker failed: {' '.join(command)}\n{completed.stderr}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def run_case(name: str, n_trials: int, seed: int, tell_lag: int, node: str) -> Dict[str, Any]:
+    python_result = run_worker(
+        [sys.executable, __file__, "--worker", name, "--trials", str(n_trials), "--seeds", str(seed)]
+    )
+    js_result = run_worker(
+        [
+            node,
+            JS_BENCH_PATH,
+            "--scenario",
+            name,
+            "--trials",
+            str(n_trials),
+            "--seed",
+            str(seed),
+            "--tell-lag",
+            str(tell_lag),
+        ]
+    )
+    return {
+        "scenario": name,
+        "nTrials": n_trials,
+        "seed": seed,
+        "python": python_result,
+        "js": js_result,
+        "wallRatioJsOverPython": ratio(js_result["wallMs"], python_result["wallMs"]),
+        "askP50RatioJsOverPython": ratio(js_result["ask"]["p50Ms"], python_result["ask"]["p50Ms"]),
+    }
+
+
+def ratio(numerator: Optional[float], denominator: Optional[float]) -> Optional[float]:
+    if numerator is None or not denominator:
+        return None
+    return numerator / denominator
+
+
+def format_number(value: Optional[float], digits: int = 2) -> str:
+    return "-" if value is None else f"{value:.{digits}f}"
+
+
+def render_markdown(cases: List[Dict[str, Any]]) -> str:
+    lines = [
+        "| scenario | trials | seed | py wall ms | js wall ms | js/py wall "
+        "| py ask p50/p95 ms | js ask p50/p95 ms | py peak MiB | js peak MiB |",
+        "| --- | ---: | ---: | ---: | ---: | ---: | ---: | ---: | ---: | ---: |",
+    ]
+    mib = 1024.0 * 1024.0
+    for case in cases:
+        py, js = case["python"], case["js"]
+        lines.append(
+            f"| {case['scenario']} | {case['nTrials']} | {case['seed']} "
+            f"| {format_number(py['wallMs'], 1)} | {format_number(js['wallMs'], 1)} "
+            f"| {format_number(case['wallRatioJsOverPython'])} "
+            f"| {format_number(py['ask']['p50Ms'])} / {format_number(py['ask']['p95Ms'])} "
+            f"| {format_number(js['ask']['p50Ms'])} / {format_number(js['ask']['p95Ms'])} "
+            f"| {format_number(py['peakRssBytes'] / mib, 1)} | {format_number(js['peakRssBytes'] / mib, 1)} |"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def parse_int_list(text: str) -> List[int]:
+    return [int(part) for part in text.split(",") if part.strip()]
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compare Optuna and optuna-tpe-js performance.")
+    parser.add_argument("--scenario", action="append", help="Scenario to benchmark (repeatable; default: all).")
+    parser.add_argument(
+        "--trials",
+        type=parse_int_list,
+        default=DEFAULT_TRIAL_COUNTS,
+        help="Comma-separated trial counts (default: 25,50,100,200).",
+    )
+    parser.add_argument("--seeds", type=parse_int_list, default=[0], help="Comma-separated seeds (default: 0).")
+    parser.add_argument("--node", default="node", help="Node.js executable.")
+    parser.add_argument("--output-dir", default=REPORT_DIR, help="Directory for the JSON and Markdown report.")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    if args.worker:
+        result = bench_python_scenario(args.worker, args.trials[0], args.seeds[0])
+        print(json.dumps(result))
+        return
+
+    import generate_tpe_golden
+
+    names = args.scenario or [spec.name for spec in generate_tpe_golden.SCENARIOS]
+    unknown = [name for name in names if name not in generate_tpe_golden.SCENARIOS_BY_NAME]
+    if unknown:
+        raise SystemExit(f"Unknown scenario(s): {', '.join(unknown)}")
+
+    cases = []
+    for name in names:
+        tell_lag = generate_tpe_golden.SCENARIOS_BY_NAME[name].tell_lag
+        for n_trials in args.trials:
+            for seed in args.seeds:
+                case = run_case(name, n_trials, seed, tell_lag, args.node)
+                cases.append(case)
+                print(
+                    f"{name} trials={n_trials} seed={seed}: "
+                    f"python {case['python']['wallMs']:.1f} ms, js {case['js']['wallMs']:.1f} ms"
+                )
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    report = {
+        "python": cases[0]["python"]["runtime"] if cases else None,
+        "js": cases[0]["js"]["runtime"] if cases else None,
+        "cases": cases,
+    }
+    json_path = os.path.join(args.output_dir, "tpe_compare.json")
+    markdown_path = os.path.join(args.output_dir, "tpe_compare.md")
+    with open(json_path, "w", encoding="utf-8") as handle:
+        json.dump(report, handle, indent=2)
+    with open(markdown_path, "w", encoding="utf-8") as handle:
+        handle.write(render_markdown(cases))
+
+    print(f"Wrote performance report to {json_path} and {markdown_path}")
+
+
+if __name__ == "__main__":
+    main()
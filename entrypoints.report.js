@@ -0,0 +1,57 @@
+import fs from 'fs'
+import path from 'path'
+import { execFileSync } from 'child_process'
+import { fileURLToPath, pathToFileURL } from 'url'
+
+const rootDir = path.dirname(fileURLToPath(import.meta.url))
+const packageJson = JSON.parse(fs.readFileSync(path.join(rootDir, 'package.json'), 'utf8'))
+const STATIC_IMPORT_PATTERN = /^\s*(?:import|export)\s+(?:[^'"]*?\s+from\s+)?['"](\.[^'"]+)['"]/gm
+const STARTUP_RUNS = Number(process.env.ENTRYPOINT_REPORT_RUNS || 5)
+
+function collectStaticGraph(entryFile) {
+  const visited = new Set()
+  const pending = [entryFile]
+  let totalBytes = 0
+  while (pending.length > 0) {
+    const file = pending.pop()
+    if (visited.has(file)) {
+      continue
+    }
+    visited.add(file)
+    const source = fs.readFileSync(file, 'utf8')
+    totalBytes += Buffer.byteLength(source)
+    for (const match of source.matchAll(STATIC_IMPORT_PATTERN)) {
+      pending.push(path.resolve(path.dirname(file), match[1]))
+    }
+  }
+  return { modules: visited.size, bytes: totalBytes }
+}
+
+function measureStartupMs(entryFile) {
+  const script = `const t0 = performance.now(); await import(${JSON.stringify(
+    pathToFileURL(entryFile).href
+  )}); console.log(performance.now() - t0)`
+  const samples = []
+  for (let i = 0; i < STARTUP_RUNS; i += 1) {
+    const output = execFileSync(process.execPath, ['--input-type=module', '-e', script], {
+      encoding: 'utf8'
+    })
+    samples.push(Number(output.trim()))
+  }
+  samples.sort((a, b) => a - b)
+  return samples[Math.floor(samples.length / 2)]
+}
+
+const rows = []
+for (const [subpath, target] of Object.entries(packageJson.exports)) {
+  const entryFile = path.resolve(rootDir, target)
+  const graph = collectStaticGraph(entryFile)
+  rows.push({
+    subpath,
+    modules: graph.modules,
+    kib: Number((graph.bytes / 1024).toFixed(1)),
+    importMs: Number(measureStartupMs(entryFile).toFixed(2))
+  })
+}
+
+console.table(rows)
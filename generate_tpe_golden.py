@@ -3,17 +3,24 @@
 
 Usage:
   python generate_tpe_golden.py
+  python generate_tpe_golden.py --jobs 8 --scenario core_single_objective
+  python generate_tpe_golden.py --format compact
 """
 
 from __future__ import annotations
 
+import argparse
+import hashlib
+import inspect
 import json
 import math
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime
 from datetime import timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 import optuna
 from optuna.samplers import TPESampler
 from optuna.trial import TrialState
@@ -21,6 +28,10 @@ from optuna.trial import TrialState
 ROOT = os.path.abspath(os.path.dirname(__file__))
 FIXTURE_DIR = os.path.join(ROOT, "fixtures", "golden-tpe")
 FIXTURE_PATH = os.path.join(FIXTURE_DIR, "tpe_golden.json")
+SHARD_DIR = os.path.join(FIXTURE_DIR, "scenarios")
+SHARD_MANIFEST_PATH = os.path.join(SHARD_DIR, "manifest.json")
+CACHE_DIR = os.path.join(ROOT, ".golden-cache")
+CACHE_VERSION = 1
 
 
 @dataclass
@@ -672,349 +683,370 @@ def run_constraints_pruning_constant_liar(seed: int, n_trials: int, tell_lag: in
     return records
 
 
-def main() -> None:
-    scenarios = []
-    seeds = [0, 1, 2, 3, 4]
-    n_trials = 200
-    extended_n_trials = 120
-    enqueued_n_trials = 8
-    fail_n_trials = 24
+@dataclass(frozen=True)
+class ScenarioSpec:
+    name: str
+    runner: Callable[..., List[TrialRecord]]
+    n_trials: int
+    objective_directions: List[str]
+    tell_lag: int = 0
+
+    def run(self, seed: int) -> List[TrialRecord]:
+        if self.tell_lag > 0:
+            return self.runner(seed, self.n_trials, self.tell_lag)
+        return self.runner(seed, self.n_trials)
+
+
+SEEDS = [0, 1, 2, 3, 4]
+N_TRIALS = 200
+EXTENDED_N_TRIALS = 120
+ENQUEUED_N_TRIALS = 8
+FAIL_N_TRIALS = 24
+
+SCENARIOS: List[ScenarioSpec] = [
+    ScenarioSpec("core_single_objective", run_single_objective, N_TRIALS, ["minimize"]),
+    ScenarioSpec(
+        "single_objective_enqueued_trials",
+        run_single_objective_enqueued_trials,
+        ENQUEUED_N_TRIALS,
+        ["minimize"],
+    ),
+    ScenarioSpec(
+        "single_objective_failures", run_single_objective_failures, FAIL_N_TRIALS, ["minimize"]
+    ),
+    ScenarioSpec(
+        "single_objective_maximize_numeric",
+        run_single_objective_maximize_numeric,
+        EXTENDED_N_TRIALS,
+        ["maximize"],
+    ),
+    ScenarioSpec(
+        "single_objective_prior_weight",
+        run_single_objective_prior_weight,
+        EXTENDED_N_TRIALS,
+        ["minimize"],
+    ),
+    ScenarioSpec(
+        "single_objective_magic_clip_endpoints",
+        run_single_objective_magic_clip_endpoints,
+        EXTENDED_N_TRIALS,
+        ["minimize"],
+    ),
+    ScenarioSpec(
+        "single_objective_gamma_custom",
+        run_single_objective_gamma_custom,
+        EXTENDED_N_TRIALS,
+        ["minimize"],
+    ),
+    ScenarioSpec(
+        "single_objective_weights_custom",
+        run_single_objective_weights_custom,
+        EXTENDED_N_TRIALS,
+        ["minimize"],
+    ),
+    ScenarioSpec(
+        "single_objective_n_ei_candidates_custom",
+        run_single_objective_n_ei_candidates_custom,
+        EXTENDED_N_TRIALS,
+        ["minimize"],
+    ),
+    ScenarioSpec(
+        "single_objective_high_startup",
+        run_single_objective_high_startup,
+        EXTENDED_N_TRIALS,
+        ["minimize"],
+    ),
+    ScenarioSpec(
+        "single_objective_multivariate",
+        run_single_objective_multivariate,
+        EXTENDED_N_TRIALS,
+        ["minimize"],
+    ),
+    ScenarioSpec(
+        "single_objective_group", run_single_objective_group, EXTENDED_N_TRIALS, ["minimize"]
+    ),
+    ScenarioSpec(
+        "single_objective_dynamic_independent",
+        run_single_objective_dynamic_independent,
+        EXTENDED_N_TRIALS,
+        ["minimize"],
+    ),
+    ScenarioSpec("multi_objective_group", run_multi_objective, N_TRIALS, ["minimize", "minimize"]),
+    ScenarioSpec(
+        "multi_objective_dynamic_independent",
+        run_multi_objective_dynamic_independent,
+        N_TRIALS,
+        ["minimize", "minimize"],
+    ),
+    ScenarioSpec(
+        "multi_objective_mixed_directions",
+        run_multi_objective_mixed_directions,
+        EXTENDED_N_TRIALS,
+        ["minimize", "maximize"],
+    ),
+    ScenarioSpec(
+        "constant_liar_delayed_single",
+        run_constant_liar_delayed_single,
+        EXTENDED_N_TRIALS,
+        ["minimize"],
+        tell_lag=2,
+    ),
+    ScenarioSpec(
+        "constraints_pruning_constant_liar",
+        run_constraints_pruning_constant_liar,
+        N_TRIALS,
+        ["minimize"],
+        tell_lag=1,
+    ),
+]
+SCENARIOS_BY_NAME: Dict[str, ScenarioSpec] = {spec.name: spec for spec in SCENARIOS}
+
+
+def run_scenario_seed(name: str, seed: int) -> List[Dict[str, Any]]:
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+    return [record.__dict__ for record in SCENARIOS_BY_NAME[name].run(seed)]
+
+
+def collect_function_sources(fn: Callable[..., Any], sources: Dict[str, str]) -> None:
+    if fn.__qualname__ in sources:
+        return
+    sources[fn.__qualname__] = inspect.getsource(fn)
+    module_globals = fn.__globals__
+    pending = [fn.__code__]
+    while pending:
+        code = pending.pop()
+        for const in code.co_consts:
+            if inspect.iscode(const):
+                pending.append(const)
+        for name in code.co_names:
+            target = module_globals.get(name)
+            if inspect.isfunction(target) and target.__module__ == fn.__module__:
+                collect_function_sources(target, sources)
+            elif inspect.isclass(target) and target.__module__ == fn.__module__:
+                sources.setdefault(target.__qualname__, inspect.getsource(target))
+
+
+def scenario_cache_key(spec: ScenarioSpec, seed: int) -> str:
+    sources: Dict[str, str] = {}
+    collect_function_sources(spec.runner, sources)
+    key_payload = {
+        "cacheVersion": CACHE_VERSION,
+        "sources": sorted(sources.items()),
+        "seed": seed,
+        "nTrials": spec.n_trials,
+        "tellLag": spec.tell_lag,
+        "optunaVersion": getattr(optuna, "__version__", "unknown"),
+    }
+    encoded = json.dumps(key_payload, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def cache_entry_path(cache_dir: str, name: str, seed: int, key: str) -> str:
+    return os.path.join(cache_dir, f"{name}.seed{seed}.{key[:16]}.json")
+
+
+def load_cache_entry(path: str) -> Optional[List[Dict[str, Any]]]:
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as handle:
+            return json.load(handle)["trials"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def store_cache_entry(cache_dir: str, name: str, seed: int, key: str, trials: List[Dict[str, Any]]) -> None:
+    os.makedirs(cache_dir, exist_ok=True)
+    path = cache_entry_path(cache_dir, name, seed, key)
+    prefix = f"{name}.seed{seed}."
+    for entry in os.listdir(cache_dir):
+        if entry.startswith(prefix) and os.path.join(cache_dir, entry) != path:
+            os.remove(os.path.join(cache_dir, entry))
+    write_json(path, {"name": name, "seed": seed, "key": key, "trials": trials}, None)
+
+
+def run_scenarios(
+    specs: List[ScenarioSpec],
+    jobs: int,
+    cache_dir: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    tasks = [(spec.name, seed) for spec in specs for seed in SEEDS]
+    trials_by_task: Dict[tuple[str, int], List[Dict[str, Any]]] = {}
+    cache_keys: Dict[tuple[str, int], str] = {}
+    if cache_dir is not None:
+        for name, seed in tasks:
+            key = scenario_cache_key(SCENARIOS_BY_NAME[name], seed)
+            cache_keys[(name, seed)] = key
+            cached = load_cache_entry(cache_entry_path(cache_dir, name, seed, key))
+            if cached is not None:
+                trials_by_task[(name, seed)] = cached
+
+    stale = [task for task in tasks if task not in trials_by_task]
+    if jobs <= 1:
+        results = [run_scenario_seed(name, seed) for name, seed in stale]
+    else:
+        stale.sort(key=lambda task: -SCENARIOS_BY_NAME[task[0]].n_trials)
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = [executor.submit(run_scenario_seed, name, seed) for name, seed in stale]
+            results = [future.result() for future in futures]
 
-    scenarios.append(
-        {
-            "name": "core_single_objective",
-            "tellLag": 0,
-            "objectiveDirections": ["minimize"],
-            "runs": [
-                {
-                    "seed": seed,
-                    "trials": [record.__dict__ for record in run_single_objective(seed, n_trials)],
-                }
-                for seed in seeds
-            ],
-        }
-    )
+    for (name, seed), trials in zip(stale, results):
+        trials_by_task[(name, seed)] = trials
+        if cache_dir is not None:
+            store_cache_entry(cache_dir, name, seed, cache_keys[(name, seed)], trials)
 
-    scenarios.append(
-        {
-            "name": "single_objective_enqueued_trials",
-            "tellLag": 0,
-            "objectiveDirections": ["minimize"],
-            "runs": [
-                {
-                    "seed": seed,
-                    "trials": [
-                        record.__dict__
-                        for record in run_single_objective_enqueued_trials(seed, enqueued_n_trials)
-                    ],
-                }
-                for seed in seeds
-            ],
-        }
-    )
+    if cache_dir is not None:
+        print(f"Golden cache: {len(tasks) - len(stale)} reused, {len(stale)} recomputed ({cache_dir})")
 
-    scenarios.append(
+    return [
         {
-            "name": "single_objective_failures",
-            "tellLag": 0,
-            "objectiveDirections": ["minimize"],
+            "name": spec.name,
+            "tellLag": spec.tell_lag,
+            "objectiveDirections": list(spec.objective_directions),
             "runs": [
-                {
-                    "seed": seed,
-                    "trials": [
-                        record.__dict__
-                        for record in run_single_objective_failures(seed, fail_n_trials)
-                    ],
-                }
-                for seed in seeds
+                {"seed": seed, "trials": trials_by_task[(spec.name, seed)]} for seed in SEEDS
             ],
         }
-    )
+        for spec in specs
+    ]
 
-    scenarios.append(
-        {
-            "name": "single_objective_maximize_numeric",
-            "tellLag": 0,
-            "objectiveDirections": ["maximize"],
-            "runs": [
-                {
-                    "seed": seed,
-                    "trials": [
-                        record.__dict__
-                        for record in run_single_objective_maximize_numeric(seed, extended_n_trials)
-                    ],
-                }
-                for seed in seeds
-            ],
-        }
-    )
 
-    scenarios.append(
-        {
-            "name": "single_objective_prior_weight",
-            "tellLag": 0,
-            "objectiveDirections": ["minimize"],
-            "runs": [
-                {
-                    "seed": seed,
-                    "trials": [
-                        record.__dict__
-                        for record in run_single_objective_prior_weight(seed, extended_n_trials)
-                    ],
-                }
-                for seed in seeds
-            ],
-        }
-    )
+def build_meta() -> Dict[str, Any]:
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+        "optuna_version": getattr(optuna, "__version__", "unknown"),
+    }
 
-    scenarios.append(
-        {
-            "name": "single_objective_magic_clip_endpoints",
-            "tellLag": 0,
-            "objectiveDirections": ["minimize"],
-            "runs": [
-                {
-                    "seed": seed,
-                    "trials": [
-                        record.__dict__
-                        for record in run_single_objective_magic_clip_endpoints(
-                            seed, extended_n_trials
-                        )
-                    ],
-                }
-                for seed in seeds
-            ],
-        }
-    )
 
-    scenarios.append(
-        {
-            "name": "single_objective_gamma_custom",
-            "tellLag": 0,
-            "objectiveDirections": ["minimize"],
-            "runs": [
-                {
-                    "seed": seed,
-                    "trials": [
-                        record.__dict__
-                        for record in run_single_objective_gamma_custom(seed, extended_n_trials)
-                    ],
-                }
-                for seed in seeds
-            ],
-        }
-    )
+def write_json(path: str, payload: Any, indent: Optional[int]) -> None:
+    separators = None if indent is not None else (",", ":")
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as handle:
+        json.dump(payload, handle, indent=indent, separators=separators)
+    os.replace(tmp_path, path)
 
-    scenarios.append(
-        {
-            "name": "single_objective_weights_custom",
-            "tellLag": 0,
-            "objectiveDirections": ["minimize"],
-            "runs": [
-                {
-                    "seed": seed,
-                    "trials": [
-                        record.__dict__
-                        for record in run_single_objective_weights_custom(seed, extended_n_trials)
-                    ],
-                }
-                for seed in seeds
-            ],
-        }
-    )
 
-    scenarios.append(
-        {
-            "name": "single_objective_n_ei_candidates_custom",
-            "tellLag": 0,
-            "objectiveDirections": ["minimize"],
-            "runs": [
-                {
-                    "seed": seed,
-                    "trials": [
-                        record.__dict__
-                        for record in run_single_objective_n_ei_candidates_custom(
-                            seed, extended_n_trials
-                        )
-                    ],
-                }
-                for seed in seeds
-            ],
-        }
-    )
+def shard_path(name: str) -> str:
+    return os.path.join(SHARD_DIR, f"{name}.json")
 
-    scenarios.append(
-        {
-            "name": "single_objective_high_startup",
-            "tellLag": 0,
-            "objectiveDirections": ["minimize"],
-            "runs": [
-                {
-                    "seed": seed,
-                    "trials": [
-                        record.__dict__
-                        for record in run_single_objective_high_startup(seed, extended_n_trials)
-                    ],
-                }
-                for seed in seeds
-            ],
-        }
-    )
 
-    scenarios.append(
-        {
-            "name": "single_objective_multivariate",
-            "tellLag": 0,
-            "objectiveDirections": ["minimize"],
-            "runs": [
-                {
-                    "seed": seed,
-                    "trials": [
-                        record.__dict__
-                        for record in run_single_objective_multivariate(seed, extended_n_trials)
-                    ],
-                }
-                for seed in seeds
-            ],
-        }
-    )
+def manifest_entry(scenario: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "name": scenario["name"],
+        "file": os.path.basename(shard_path(scenario["name"])),
+        "seeds": [run["seed"] for run in scenario["runs"]],
+        "trials": sum(len(run["trials"]) for run in scenario["runs"]),
+    }
 
-    scenarios.append(
-        {
-            "name": "single_objective_group",
-            "tellLag": 0,
-            "objectiveDirections": ["minimize"],
-            "runs": [
-                {
-                    "seed": seed,
-                    "trials": [
-                        record.__dict__
-                        for record in run_single_objective_group(seed, extended_n_trials)
-                    ],
-                }
-                for seed in seeds
-            ],
-        }
-    )
 
-    scenarios.append(
-        {
-            "name": "single_objective_dynamic_independent",
-            "tellLag": 0,
-            "objectiveDirections": ["minimize"],
-            "runs": [
-                {
-                    "seed": seed,
-                    "trials": [
-                        record.__dict__
-                        for record in run_single_objective_dynamic_independent(seed, extended_n_trials)
-                    ],
-                }
-                for seed in seeds
-            ],
-        }
-    )
+def read_json(path: str) -> Any:
+    with open(path, "r", encoding="utf-8") as handle:
+        return json.load(handle)
 
-    scenarios.append(
-        {
-            "name": "multi_objective_group",
-            "tellLag": 0,
-            "objectiveDirections": ["minimize", "minimize"],
-            "runs": [
-                {
-                    "seed": seed,
-                    "trials": [record.__dict__ for record in run_multi_objective(seed, n_trials)],
-                }
-                for seed in seeds
-            ],
-        }
-    )
 
-    scenarios.append(
-        {
-            "name": "multi_objective_dynamic_independent",
-            "tellLag": 0,
-            "objectiveDirections": ["minimize", "minimize"],
-            "runs": [
-                {
-                    "seed": seed,
-                    "trials": [
-                        record.__dict__
-                        for record in run_multi_objective_dynamic_independent(seed, n_trials)
-                    ],
-                }
-                for seed in seeds
-            ],
+def load_existing_scenarios() -> Dict[str, Dict[str, Any]]:
+    if os.path.exists(SHARD_MANIFEST_PATH):
+        manifest = read_json(SHARD_MANIFEST_PATH)
+        return {
+            entry["name"]: read_json(os.path.join(SHARD_DIR, entry["file"]))
+            for entry in manifest["scenarios"]
         }
-    )
+    if os.path.exists(FIXTURE_PATH):
+        fixture = read_json(FIXTURE_PATH)
+        return {scenario["name"]: scenario for scenario in fixture["scenarios"]}
+    return {}
 
-    scenarios.append(
-        {
-            "name": "multi_objective_mixed_directions",
-            "tellLag": 0,
-            "objectiveDirections": ["minimize", "maximize"],
-            "runs": [
-                {
-                    "seed": seed,
-                    "trials": [
-                        record.__dict__
-                        for record in run_multi_objective_mixed_directions(seed, extended_n_trials)
-                    ],
-                }
-                for seed in seeds
-            ],
-        }
-    )
 
-    scenarios.append(
-        {
-            "name": "constant_liar_delayed_single",
-            "tellLag": 2,
-            "objectiveDirections": ["minimize"],
-            "runs": [
-                {
-                    "seed": seed,
-                    "trials": [
-                        record.__dict__
-                        for record in run_constant_liar_delayed_single(seed, extended_n_trials, 2)
-                    ],
-                }
-                for seed in seeds
-            ],
-        }
+def write_fixture(
+    scenarios: List[Dict[str, Any]],
+    output_format: str,
+    existing: Dict[str, Dict[str, Any]],
+) -> str:
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    generated = {scenario["name"]: scenario for scenario in scenarios}
+    merged = [
+        generated.get(spec.name) or existing[spec.name]
+        for spec in SCENARIOS
+        if spec.name in generated or spec.name in existing
+    ]
+    meta = build_meta()
+
+    if output_format == "sharded":
+        from_shards = os.path.exists(SHARD_MANIFEST_PATH)
+        os.makedirs(SHARD_DIR, exist_ok=True)
+        for scenario in merged:
+            if scenario["name"] in generated or not from_shards:
+                write_json(shard_path(scenario["name"]), scenario, None)
+        entries = [manifest_entry(scenario) for scenario in merged]
+        write_json(SHARD_MANIFEST_PATH, {"meta": meta, "scenarios": entries}, 2)
+        if os.path.exists(FIXTURE_PATH):
+            os.remove(FIXTURE_PATH)
+        return SHARD_MANIFEST_PATH
+
+    indent = 2 if output_format == "indented" else None
+    write_json(FIXTURE_PATH, {"meta": meta, "scenarios": merged}, indent)
+    if os.path.exists(SHARD_MANIFEST_PATH):
+        os.remove(SHARD_MANIFEST_PATH)
+    return FIXTURE_PATH
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate golden-output fixtures for JS TPE parity tests.")
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=[spec.name for spec in SCENARIOS],
+        help="Regenerate only this scenario (repeatable). Other scenarios are kept from the existing fixture.",
     )
-
-    scenarios.append(
-        {
-            "name": "constraints_pruning_constant_liar",
-            "tellLag": 1,
-            "objectiveDirections": ["minimize"],
-            "runs": [
-                {
-                    "seed": seed,
-                    "trials": [
-                        record.__dict__
-                        for record in run_constraints_pruning_constant_liar(seed, n_trials, 1)
-                    ],
-                }
-                for seed in seeds
-            ],
-        }
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Worker processes for scenario/seed runs (default: CPU count).",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=CACHE_DIR,
+        help="Directory for per-scenario/seed results keyed by a hash of their inputs.",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Recompute every selected scenario and leave the cache untouched.",
     )
+    parser.add_argument(
+        "--format",
+        choices=["compact", "indented", "sharded"],
+        default="sharded",
+        help="sharded (default) writes one file per scenario plus a manifest; compact/indented write tpe_golden.json.",
+    )
+    return parser.parse_args(argv)
 
-    payload = {
-        "meta": {
-            "generated_at": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
-            "optuna_version": getattr(optuna, "__version__", "unknown"),
-        },
-        "scenarios": scenarios,
-    }
 
-    os.makedirs(FIXTURE_DIR, exist_ok=True)
-    with open(FIXTURE_PATH, "w", encoding="utf-8") as handle:
-        json.dump(payload, handle, indent=2)
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    if args.scenario:
+        selected = set(args.scenario)
+        specs = [spec for spec in SCENARIOS if spec.name in selected]
+    else:
+        specs = list(SCENARIOS)
+
+    existing = load_existing_scenarios() if args.scenario else {}
+    if args.scenario and not existing and len(specs) < len(SCENARIOS):
+        raise SystemExit(
+            "No existing golden fixture to merge --scenario results into. "
+            "Run without --scenario to generate every scenario first."
+        )
+
+    started = time.perf_counter()
+    scenarios = run_scenarios(specs, args.jobs, None if args.no_cache else args.cache_dir)
+    output_path = write_fixture(scenarios, args.format, existing)
+    elapsed = time.perf_counter() - started
 
-    print(f"Wrote golden fixture to {FIXTURE_PATH}")
+    print(
+        f"Wrote golden fixture to {output_path} "
+        f"({len(specs)} scenarios, {args.jobs} jobs, {elapsed:.1f}s)"
+    )
 
 
 if __name__ == "__main__":
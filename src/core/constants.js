@@ -3,7 +3,8 @@ export const CONSTRAINTS_KEY = 'constraints'
 export const FIXED_PARAMS_KEY = 'fixed_params'
 
 export const STUDY_SNAPSHOT_MAGIC = 'optuna_tpe_study_snapshot'
-export const STUDY_SNAPSHOT_VERSION = 1
+export const STUDY_SNAPSHOT_VERSION = 2
+export const SUPPORTED_STUDY_SNAPSHOT_VERSIONS = [1, 2]
 export const SPECIAL_NUMBER_MARKER = '__optuna_tpe_special_number__'
 export const FUNCTION_SPEC_KIND = {
   BUILTIN: 'builtin',
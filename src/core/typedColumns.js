@@ -0,0 +1,15 @@
+export function growTypedColumn(column, index, fillValue = 0) {
+  if (index < column.length) {
+    return column
+  }
+  let capacity = Math.max(column.length, 1) * 2
+  while (capacity <= index) {
+    capacity *= 2
+  }
+  const grown = new column.constructor(capacity)
+  if (fillValue !== 0) {
+    grown.fill(fillValue)
+  }
+  grown.set(column)
+  return grown
+}
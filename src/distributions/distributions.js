@@ -22,6 +22,7 @@ export class FloatDistribution {
     this.low = Number(low)
     this.high = Number(high)
     this.log = !!log
+    this.internKey = null
   }
 
   single() {
@@ -50,6 +51,12 @@ export class FloatDistribution {
   }
 
   equals(other) {
+    if (this === other) {
+      return true
+    }
+    if (this.internKey !== null && other instanceof FloatDistribution && other.internKey !== null) {
+      return this.internKey === other.internKey
+    }
     return (
       other instanceof FloatDistribution &&
       this.low === other.low &&
@@ -79,6 +86,7 @@ export class IntDistribution {
     this.step = Number(step)
     this.low = Number(low)
     this.high = Number(adjustIntUniformHigh(Number(low), Number(high), Number(step)))
+    this.internKey = null
   }
 
   toInternalRepr(value) {
@@ -107,6 +115,12 @@ export class IntDistribution {
   }
 
   equals(other) {
+    if (this === other) {
+      return true
+    }
+    if (this.internKey !== null && other instanceof IntDistribution && other.internKey !== null) {
+      return this.internKey === other.internKey
+    }
     return (
       other instanceof IntDistribution &&
       this.low === other.low &&
@@ -123,15 +137,26 @@ export class CategoricalDistribution {
       throw new Error('CategoricalDistribution: choices must contain one or more elements.')
     }
     this.choices = [...choices]
+    this.choiceIndex = new Map()
+    for (let i = 0; i < this.choices.length; i += 1) {
+      if (!this.choiceIndex.has(this.choices[i])) {
+        this.choiceIndex.set(this.choices[i], i)
+      }
+    }
+    this.internKey = null
+  }
+
+  indexOf(value) {
+    const idx = this.choiceIndex.get(value)
+    return idx === undefined ? -1 : idx
   }
 
   toInternalRepr(value) {
-    for (let i = 0; i < this.choices.length; i += 1) {
-      if (Object.is(this.choices[i], value) || this.choices[i] === value) {
-        return i
-      }
+    const idx = this.indexOf(value)
+    if (idx === -1) {
+      throw new Error(`'${value}' not in categorical choices.`)
     }
-    throw new Error(`'${value}' not in categorical choices.`)
+    return idx
   }
 
   toExternalRepr(value) {
@@ -143,9 +168,15 @@ export class CategoricalDistribution {
   }
 
   equals(other) {
+    if (this === other) {
+      return true
+    }
     if (!(other instanceof CategoricalDistribution)) {
       return false
     }
+    if (this.internKey !== null && other.internKey !== null) {
+      return this.internKey === other.internKey
+    }
     if (this.choices.length !== other.choices.length) {
       return false
     }
@@ -160,12 +191,7 @@ export class CategoricalDistribution {
 
 export function distributionContainsValue(distribution, value) {
   if (distribution instanceof CategoricalDistribution) {
-    try {
-      distribution.toInternalRepr(value)
-      return true
-    } catch {
-      return false
-    }
+    return distribution.indexOf(value) !== -1
   }
 
   let numeric
@@ -204,6 +230,93 @@ export function distributionContainsValue(distribution, value) {
   return false
 }
 
+const objectChoiceIds = new WeakMap()
+let nextObjectChoiceId = 0
+
+function choiceKey(choice) {
+  if (choice === null) return 'null'
+  const choiceType = typeof choice
+  if (choiceType === 'number') return `n:${String(choice)}`
+  if (choiceType === 'string') return `s:${choice}`
+  if (choiceType === 'boolean') return `b:${choice}`
+  if (choiceType === 'undefined') return 'u'
+  if (choiceType === 'bigint') return `i:${choice}`
+  if (choiceType === 'object' || choiceType === 'function') {
+    let id = objectChoiceIds.get(choice)
+    if (id === undefined) {
+      id = nextObjectChoiceId
+      nextObjectChoiceId += 1
+      objectChoiceIds.set(choice, id)
+    }
+    return `o:${id}`
+  }
+  return null
+}
+
+export function distributionInternKey(distribution) {
+  if (distribution instanceof FloatDistribution || distribution instanceof IntDistribution) {
+    const numbers = [distribution.low, distribution.high, distribution.step]
+    if (numbers.some((v) => Number.isNaN(v))) {
+      return null
+    }
+    const tag = distribution instanceof FloatDistribution ? 'F' : 'I'
+    return JSON.stringify([tag, ...numbers.map((v) => (v === null ? null : String(v))), distribution.log])
+  }
+  if (distribution instanceof CategoricalDistribution) {
+    const keys = distribution.choices.map(choiceKey)
+    if (keys.includes(null)) {
+      return null
+    }
+    return JSON.stringify(['C', ...keys])
+  }
+  return null
+}
+
+const internedDistributions = new Map()
+const internedDistributionCleanup = new FinalizationRegistry((key) => {
+  const ref = internedDistributions.get(key)
+  if (ref !== undefined && ref.deref() === undefined) {
+    internedDistributions.delete(key)
+  }
+})
+
+function copyDistribution(distribution) {
+  if (distribution instanceof CategoricalDistribution) {
+    return new CategoricalDistribution(distribution.choices)
+  }
+  return Object.assign(Object.create(Object.getPrototypeOf(distribution)), distribution)
+}
+
+function internWithKey(distribution, key, ownsDistribution) {
+  const existing = internedDistributions.get(key)?.deref()
+  if (existing !== undefined) {
+    return existing
+  }
+
+  const interned = ownsDistribution ? distribution : copyDistribution(distribution)
+  interned.internKey = key
+  if (interned instanceof CategoricalDistribution) {
+    Object.freeze(interned.choices)
+  }
+  Object.freeze(interned)
+  internedDistributions.set(key, new WeakRef(interned))
+  internedDistributionCleanup.register(interned, key)
+  return interned
+}
+
+export function internDistribution(distribution) {
+  if (distribution.internKey !== null) {
+    return distribution
+  }
+  const key = distributionInternKey(distribution)
+  return key === null ? distribution : internWithKey(distribution, key, false)
+}
+
+export function internNewDistribution(distribution) {
+  const key = distributionInternKey(distribution)
+  return key === null ? distribution : internWithKey(distribution, key, true)
+}
+
 function adjustDiscreteUniformHigh(low, high, step) {
   const r = high - low
   const q = Math.floor(r / step)
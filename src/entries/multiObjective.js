@@ -0,0 +1,13 @@
+import {
+  calculateWeightsBelowForMultiObjective,
+  splitCompleteTrialsMultiObjective
+} from '../multiObjective/splitTrials.js'
+import { registerMultiObjectiveSupport } from '../sampler/multiObjectiveSupport.js'
+
+registerMultiObjectiveSupport({
+  splitCompleteTrialsMultiObjective,
+  calculateWeightsBelowForMultiObjective
+})
+
+export { calculateWeightsBelowForMultiObjective, splitCompleteTrialsMultiObjective }
+export { computeHypervolume } from '../multiObjective/hypervolume.js'
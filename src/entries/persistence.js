@@ -0,0 +1,12 @@
+export {
+  createDistributionTable,
+  deserializeDistributionFromSnapshot,
+  deserializeDistributionTable,
+  deserializeSamplerFromSnapshot,
+  deserializeTrialFromSnapshot,
+  registerSamplerSnapshotCodec,
+  serializeDistributionForSnapshot,
+  serializeSamplerForSnapshot,
+  serializeTrialForSnapshot
+} from '../study/snapshotCodec.js'
+export { serializeStudy, deserializeStudy } from '../study/study.js'
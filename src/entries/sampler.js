@@ -0,0 +1,2 @@
+export { TPESampler, createTPESampler } from '../sampler/tpeSampler.js'
+export { loadMultiObjectiveSupport } from '../sampler/multiObjectiveSupport.js'
@@ -0,0 +1,8 @@
+export { TrialState, StudyDirection } from '../core/enums.js'
+export {
+  FloatDistribution,
+  IntDistribution,
+  CategoricalDistribution,
+  internDistribution
+} from '../distributions/distributions.js'
+export { Study, serializeStudy, deserializeStudy, sanitizeParams } from '../study/study.js'
@@ -133,3 +133,51 @@ export function numpyQuickArgSort(values) {
 
   return tosort
 }
+
+export function argSelectSmallest(n, k, compare) {
+  const cmp = (i, j) => {
+    const c = compare(i, j)
+    if (c < 0) return -1
+    if (c > 0) return 1
+    return i - j
+  }
+
+  const size = Math.max(0, Math.min(k, n))
+  if (size === 0) {
+    return new Int32Array(0)
+  }
+  if (size === n) {
+    return Int32Array.from({ length: n }, (_, i) => i).sort(cmp)
+  }
+
+  const heap = new Int32Array(size)
+  const siftDown = (root) => {
+    for (;;) {
+      let child = root * 2 + 1
+      if (child >= size) return
+      if (child + 1 < size && cmp(heap[child + 1], heap[child]) > 0) {
+        child += 1
+      }
+      if (cmp(heap[child], heap[root]) <= 0) return
+      const tmp = heap[root]
+      heap[root] = heap[child]
+      heap[child] = tmp
+      root = child
+    }
+  }
+
+  for (let i = 0; i < size; i += 1) {
+    heap[i] = i
+  }
+  for (let i = (size >> 1) - 1; i >= 0; i -= 1) {
+    siftDown(i)
+  }
+  for (let i = size; i < n; i += 1) {
+    if (cmp(i, heap[0]) < 0) {
+      heap[0] = i
+      siftDown(0)
+    }
+  }
+
+  return heap.sort(cmp)
+}
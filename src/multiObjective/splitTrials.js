@@ -1,18 +1,18 @@
-import { CONSTRAINTS_KEY, EPS } from '../core/constants.js'
-import { StudyDirection, TrialState } from '../core/enums.js'
+import { EPS } from '../core/constants.js'
+import { StudyDirection } from '../core/enums.js'
 import { computeHypervolume } from './hypervolume.js'
 import { getReferencePoint, solveHssp } from './hssp.js'
 import { fastNonDominationRank, isParetoFront } from './pareto.js'
 
-export function splitCompleteTrialsSingleObjective(trials, study, nBelow) {
-  const sorted = [...trials].sort((a, b) => {
-    if (study.direction === StudyDirection.MINIMIZE) {
-      return a.value - b.value
-    }
-    return b.value - a.value
-  })
-  return [sorted.slice(0, nBelow), sorted.slice(nBelow)]
-}
+export {
+  getInfeasibleTrialScore,
+  getPrunedTrialScore,
+  splitCompleteTrials,
+  splitCompleteTrialsSingleObjective,
+  splitInfeasibleTrials,
+  splitPrunedTrials,
+  splitTrials
+} from '../sampler/splitTrials.js'
 
 export function splitCompleteTrialsMultiObjective(trials, study, nBelow) {
   if (nBelow === 0) {
@@ -84,108 +84,19 @@ export function splitCompleteTrialsMultiObjective(trials, study, nBelow) {
 
   return [below, above]
 }
-
-export function splitCompleteTrials(trials, study, nBelow) {
-  const clipped = Math.min(nBelow, trials.length)
-  if (study.directions.length <= 1) {
-    return splitCompleteTrialsSingleObjective(trials, study, clipped)
-  }
-  return splitCompleteTrialsMultiObjective(trials, study, clipped)
-}
-
-export function getPrunedTrialScore(trial, study) {
-  const entries = Object.entries(trial.intermediate_values)
-  if (entries.length > 0) {
-    entries.sort((a, b) => Number(a[0]) - Number(b[0]))
-    const [stepRaw, val] = entries[entries.length - 1]
-    const step = Number(stepRaw)
-    if (Number.isNaN(val)) {
-      return [-step, Infinity]
-    }
-    if (study.direction === StudyDirection.MINIMIZE) {
-      return [-step, val]
-    }
-    return [-step, -val]
-  }
-  return [1, 0]
-}
-
-export function splitPrunedTrials(trials, study, nBelow) {
-  const clipped = Math.min(nBelow, trials.length)
-  const sorted = [...trials].sort((a, b) => {
-    const sa = getPrunedTrialScore(a, study)
-    const sb = getPrunedTrialScore(b, study)
-    if (sa[0] !== sb[0]) return sa[0] - sb[0]
-    return sa[1] - sb[1]
-  })
-  return [sorted.slice(0, clipped), sorted.slice(clipped)]
-}
-
-export function getInfeasibleTrialScore(trial) {
-  const constraint = trial.system_attrs[CONSTRAINTS_KEY]
-  if (constraint === undefined || constraint === null) {
-    return Infinity
-  }
-  let s = 0
-  for (const v of constraint) {
-    if (v > 0) s += v
-  }
-  return s
-}
-
-export function splitInfeasibleTrials(trials, nBelow) {
-  const clipped = Math.min(nBelow, trials.length)
-  const sorted = [...trials].sort(
-    (a, b) => getInfeasibleTrialScore(a) - getInfeasibleTrialScore(b)
-  )
-  return [sorted.slice(0, clipped), sorted.slice(clipped)]
-}
-
-export function splitTrials(study, trials, nBelow, constraintsEnabled) {
-  const complete = []
-  const pruned = []
-  const running = []
-  const infeasible = []
-
-  for (const trial of trials) {
-    if (trial.state === TrialState.RUNNING) {
-      running.push(trial)
-    } else if (constraintsEnabled && getInfeasibleTrialScore(trial) > 0) {
-      infeasible.push(trial)
-    } else if (trial.state === TrialState.COMPLETE) {
-      complete.push(trial)
-    } else if (trial.state === TrialState.PRUNED) {
-      pruned.push(trial)
-    } else {
-      throw new Error(`Unexpected trial state in split: ${trial.state}`)
-    }
-  }
-
-  const [belowComplete, aboveComplete] = splitCompleteTrials(complete, study, nBelow)
-  let remaining = Math.max(0, nBelow - belowComplete.length)
-  const [belowPruned, abovePruned] = splitPrunedTrials(pruned, study, remaining)
-  remaining = Math.max(0, remaining - belowPruned.length)
-  const [belowInfeasible, aboveInfeasible] = splitInfeasibleTrials(infeasible, remaining)
-
-  const below = [...belowComplete, ...belowPruned, ...belowInfeasible].sort(
-    (a, b) => a.number - b.number
-  )
-  const above = [...aboveComplete, ...abovePruned, ...aboveInfeasible, ...running].sort(
-    (a, b) => a.number - b.number
-  )
-
-  return [below, above]
-}
-
 export function calculateWeightsBelowForMultiObjective(
   study,
   belowTrials,
   constraintsFunc
 ) {
+  const store = study.constraintViolationStore
   const feasibleMask = belowTrials.map((trial) => {
     if (constraintsFunc === null || constraintsFunc === undefined) {
       return true
     }
+    if (store !== undefined && store.hasConstraints(trial.number)) {
+      return store.isFeasible(trial.number)
+    }
     return constraintsFunc(trial).every((c) => c <= 0)
   })
 
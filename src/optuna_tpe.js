@@ -1,8 +1,11 @@
+import './entries/multiObjective.js'
+
 export { TrialState, StudyDirection } from './core/enums.js'
 export {
   FloatDistribution,
   IntDistribution,
-  CategoricalDistribution
+  CategoricalDistribution,
+  internDistribution
 } from './distributions/distributions.js'
 export { Study, serializeStudy, deserializeStudy, sanitizeParams } from './study/study.js'
 export { createTPESampler } from './sampler/tpeSampler.js'
@@ -4,117 +4,157 @@ import {
   truncnormLogpdf,
   truncnormPpf
 } from '../math/truncnorm.js'
+import { cumulativeWeights } from '../random/mt19937.js'
+
+function compileCategoricalColumn(paramName, d) {
+  const nKernels = d.weights.length
+  const nChoices = d.weights[0].length
+  const cumulative = new Float64Array(nKernels * nChoices)
+  for (let k = 0; k < nKernels; k += 1) {
+    const weights = d.weights[k]
+    const offset = k * nChoices
+    let cum = 0
+    for (let choice = 0; choice < nChoices; choice += 1) {
+      cum += weights[choice]
+      cumulative[offset + choice] = choice === nChoices - 1 ? 1 : cum
+    }
+  }
+  return { paramName, nChoices, cumulative }
+}
+
+function compileNumericalColumn(paramName, d) {
+  const column = {
+    paramName,
+    mu: Float64Array.from(d.mu),
+    sigma: Float64Array.from(d.sigma),
+    low: 0,
+    high: 0,
+    log: false,
+    discrete: false,
+    discLow: 0,
+    discHigh: 0,
+    step: 0
+  }
+
+  if (d.kind === 'truncnorm') {
+    column.low = d.low
+    column.high = d.high
+  } else if (d.kind === 'trunclognorm') {
+    column.low = Math.log(d.low)
+    column.high = Math.log(d.high)
+    column.log = true
+  } else if (d.kind === 'discrete_truncnorm') {
+    column.low = d.low - d.step / 2
+    column.high = d.high + d.step / 2
+  } else if (d.kind === 'discrete_trunclognorm') {
+    column.low = Math.log(d.low - d.step / 2)
+    column.high = Math.log(d.high + d.step / 2)
+    column.log = true
+  } else {
+    throw new Error(`Unknown distribution kind: ${d.kind}`)
+  }
+
+  if (d.kind === 'discrete_truncnorm' || d.kind === 'discrete_trunclognorm') {
+    column.discrete = true
+    column.discLow = d.low
+    column.discHigh = d.high
+    column.step = d.step
+  }
+  return column
+}
+
+export function compileSamplingPlan(weights, distributions) {
+  const categorical = []
+  const numerical = []
+  for (const distDef of distributions) {
+    const d = distDef.distribution
+    if (d.kind === 'categorical') {
+      categorical.push(compileCategoricalColumn(distDef.paramName, d))
+    } else {
+      numerical.push(compileNumericalColumn(distDef.paramName, d))
+    }
+  }
+
+  return {
+    kernelCumulative: cumulativeWeights(weights),
+    paramNames: distributions.map((distDef) => distDef.paramName),
+    categorical,
+    numerical,
+    quantiles: new Float64Array(0)
+  }
+}
 
 export class MixtureOfProductDistribution {
   constructor(weights, distributions) {
     this.weights = weights
     this.distributions = distributions
+    this.samplingPlan = null
   }
 
-  sample(rng, batchSize) {
-    const activeIndices = rng.choiceWeighted(this.weights, batchSize)
-    const ret = Array.from({ length: batchSize }, () =>
-      new Array(this.distributions.length).fill(0)
-    )
-
-    const discNumerical = []
-    const numericalDefs = []
-    const numericalColumns = []
-    const logNumericalColumns = []
-    const lowsNumeric = []
-    const highsNumeric = []
-
-    for (let col = 0; col < this.distributions.length; col += 1) {
-      const distDef = this.distributions[col]
-      const d = distDef.distribution
-      if (d.kind === 'categorical') {
-        const rndQuantile = rng.rand(batchSize)
-        for (let row = 0; row < batchSize; row += 1) {
-          const weights = d.weights[activeIndices[row]]
-          let cum = 0
-          let choice = 0
-          for (; choice < weights.length; choice += 1) {
-            cum += weights[choice]
-            if (choice === weights.length - 1) {
-              cum = 1
-            }
-            if (!(cum < rndQuantile[row])) {
-              break
-            }
-          }
-          ret[row][col] = choice
-        }
-        continue
-      }
+  getSamplingPlan() {
+    if (this.samplingPlan === null) {
+      this.samplingPlan = compileSamplingPlan(this.weights, this.distributions)
+    }
+    return this.samplingPlan
+  }
 
-      numericalDefs.push(d)
-      numericalColumns.push(col)
-
-      if (d.kind === 'truncnorm') {
-        lowsNumeric.push(d.low)
-        highsNumeric.push(d.high)
-      } else if (d.kind === 'trunclognorm') {
-        lowsNumeric.push(Math.log(d.low))
-        highsNumeric.push(Math.log(d.high))
-        logNumericalColumns.push(col)
-      } else if (d.kind === 'discrete_truncnorm') {
-        lowsNumeric.push(d.low - d.step / 2)
-        highsNumeric.push(d.high + d.step / 2)
-        discNumerical.push({
-          column: col,
-          low: d.low,
-          high: d.high,
-          step: d.step
-        })
-      } else if (d.kind === 'discrete_trunclognorm') {
-        lowsNumeric.push(Math.log(d.low - d.step / 2))
-        highsNumeric.push(Math.log(d.high + d.step / 2))
-        logNumericalColumns.push(col)
-        discNumerical.push({
-          column: col,
-          low: d.low,
-          high: d.high,
-          step: d.step
-        })
-      } else {
-        throw new Error(`Unknown distribution kind: ${d.kind}`)
-      }
+  sample(rng, batchSize) {
+    const plan = this.getSamplingPlan()
+    const activeIndices = rng.choiceCumulative(plan.kernelCumulative, batchSize)
+    if (plan.quantiles.length !== batchSize) {
+      plan.quantiles = new Float64Array(batchSize)
     }
+    const quantiles = plan.quantiles
+    const columns = {}
 
-    if (numericalDefs.length > 0) {
-      const activeMus = numericalDefs.map((d) => activeIndices.map((k) => d.mu[k]))
-      const activeSigmas = numericalDefs.map((d) => activeIndices.map((k) => d.sigma[k]))
-
-      for (let i = 0; i < numericalDefs.length; i += 1) {
-        for (let row = 0; row < batchSize; row += 1) {
-          const mu = activeMus[i][row]
-          const sigma = activeSigmas[i][row]
-          const a = (lowsNumeric[i] - mu) / sigma
-          const b = (highsNumeric[i] - mu) / sigma
-          const q = rng.randomSample()
-          ret[row][numericalColumns[i]] = truncnormPpf(q, a, b) * sigma + mu
+    for (const cat of plan.categorical) {
+      const out = new Float64Array(batchSize)
+      const cumulative = cat.cumulative
+      const nChoices = cat.nChoices
+      rng.fillRandomSample(quantiles)
+      for (let row = 0; row < batchSize; row += 1) {
+        const r = quantiles[row]
+        let lo = activeIndices[row] * nChoices
+        let hi = lo + nChoices - 1
+        const offset = lo
+        while (lo < hi) {
+          const mid = (lo + hi) >>> 1
+          if (cumulative[mid] < r) {
+            lo = mid + 1
+          } else {
+            hi = mid
+          }
         }
+        out[row] = lo - offset
       }
+      columns[cat.paramName] = out
+    }
 
-      for (const col of logNumericalColumns) {
-        for (let row = 0; row < batchSize; row += 1) {
-          ret[row][col] = Math.exp(ret[row][col])
+    for (const num of plan.numerical) {
+      const out = new Float64Array(batchSize)
+      const { mu, sigma, low, high } = num
+      rng.fillRandomSample(quantiles)
+      for (let row = 0; row < batchSize; row += 1) {
+        const k = activeIndices[row]
+        const m = mu[k]
+        const s = sigma[k]
+        let x = truncnormPpf(quantiles[row], (low - m) / s, (high - m) / s) * s + m
+        if (num.log) {
+          x = Math.exp(x)
         }
-      }
-
-      for (const disc of discNumerical) {
-        for (let row = 0; row < batchSize; row += 1) {
-          const raw = ret[row][disc.column]
+        if (num.discrete) {
           const rounded =
-            disc.low + roundToNearestEven((raw - disc.low) / disc.step) * disc.step
-          ret[row][disc.column] = clip(rounded, disc.low, disc.high)
+            num.discLow + roundToNearestEven((x - num.discLow) / num.step) * num.step
+          x = clip(rounded, num.discLow, num.discHigh)
         }
+        out[row] = x
       }
+      columns[num.paramName] = out
     }
 
     const result = {}
-    for (let col = 0; col < this.distributions.length; col += 1) {
-      result[this.distributions[col].paramName] = ret.map((row) => row[col])
+    for (const paramName of plan.paramNames) {
+      result[paramName] = columns[paramName]
     }
     return result
   }
@@ -1,33 +1,67 @@
-export function randomChoiceIndicesByWeights(rng, probabilities, size) {
-  const cumulative = new Array(probabilities.length)
+const N = 624
+const M = 397
+const MATRIX_A = 0x9908b0df
+const UPPER_MASK = 0x80000000
+const LOWER_MASK = 0x7fffffff
+const MAG01 = new Uint32Array([0x0, MATRIX_A])
+
+function temper(y) {
+  y ^= y >>> 11
+  y ^= (y << 7) & 0x9d2c5680
+  y ^= (y << 15) & 0xefc60000
+  y ^= y >>> 18
+  return y >>> 0
+}
+
+export function cumulativeWeights(probabilities) {
+  const cumulative = new Float64Array(probabilities.length)
   let running = 0
   for (let i = 0; i < probabilities.length; i += 1) {
     running += probabilities[i]
     cumulative[i] = running
   }
-  cumulative[cumulative.length - 1] = 1
+  if (cumulative.length > 0) {
+    cumulative[cumulative.length - 1] = 1
+  }
+  return cumulative
+}
 
-  const out = new Array(size)
-  for (let i = 0; i < size; i += 1) {
-    const r = rng.randomSample()
-    let idx = 0
-    while (idx < cumulative.length && r >= cumulative[idx]) {
-      idx += 1
+export function searchCumulativeWeights(cumulative, r) {
+  let lo = 0
+  let hi = cumulative.length - 1
+  while (lo < hi) {
+    const mid = (lo + hi) >>> 1
+    if (r >= cumulative[mid]) {
+      lo = mid + 1
+    } else {
+      hi = mid
     }
-    out[i] = idx
+  }
+  return lo
+}
+
+export function randomChoiceIndicesByCumulative(rng, cumulative, size) {
+  const quantiles = rng.rand(size)
+  const out = new Int32Array(size)
+  for (let i = 0; i < size; i += 1) {
+    out[i] = searchCumulativeWeights(cumulative, quantiles[i])
   }
   return out
 }
 
+export function randomChoiceIndicesByWeights(rng, probabilities, size) {
+  return randomChoiceIndicesByCumulative(rng, cumulativeWeights(probabilities), size)
+}
+
 export class MT19937 {
   constructor(seed = null) {
-    this.N = 624
-    this.M = 397
-    this.MATRIX_A = 0x9908b0df
-    this.UPPER_MASK = 0x80000000
-    this.LOWER_MASK = 0x7fffffff
-    this.mt = new Uint32Array(this.N)
-    this.mti = this.N + 1
+    this.N = N
+    this.M = M
+    this.MATRIX_A = MATRIX_A
+    this.UPPER_MASK = UPPER_MASK
+    this.LOWER_MASK = LOWER_MASK
+    this.mt = new Uint32Array(N)
+    this.mti = N + 1
     if (seed !== null && seed !== undefined) {
       this.seed(seed)
     } else {
@@ -38,7 +72,7 @@ export class MT19937 {
   seed(seed) {
     let s = Number(seed) >>> 0
     this.mt[0] = s
-    for (this.mti = 1; this.mti < this.N; this.mti += 1) {
+    for (this.mti = 1; this.mti < N; this.mti += 1) {
       s = this.mt[this.mti - 1] ^ (this.mt[this.mti - 1] >>> 30)
       this.mt[this.mti] =
         ((((s & 0xffff0000) >>> 16) * 1812433253) << 16) +
@@ -48,34 +82,30 @@ export class MT19937 {
     }
   }
 
-  _genInt32() {
+  _twist() {
+    const mt = this.mt
     let y
-    const mag01 = [0x0, this.MATRIX_A]
+    let kk
+    for (kk = 0; kk < N - M; kk += 1) {
+      y = (mt[kk] & UPPER_MASK) | (mt[kk + 1] & LOWER_MASK)
+      mt[kk] = mt[kk + M] ^ (y >>> 1) ^ MAG01[y & 0x1]
+    }
+    for (; kk < N - 1; kk += 1) {
+      y = (mt[kk] & UPPER_MASK) | (mt[kk + 1] & LOWER_MASK)
+      mt[kk] = mt[kk + (M - N)] ^ (y >>> 1) ^ MAG01[y & 0x1]
+    }
+    y = (mt[N - 1] & UPPER_MASK) | (mt[0] & LOWER_MASK)
+    mt[N - 1] = mt[M - 1] ^ (y >>> 1) ^ MAG01[y & 0x1]
+  }
 
-    if (this.mti >= this.N) {
-      let kk
-      for (kk = 0; kk < this.N - this.M; kk += 1) {
-        y = (this.mt[kk] & this.UPPER_MASK) | (this.mt[kk + 1] & this.LOWER_MASK)
-        this.mt[kk] = this.mt[kk + this.M] ^ (y >>> 1) ^ mag01[y & 0x1]
-      }
-      for (; kk < this.N - 1; kk += 1) {
-        y = (this.mt[kk] & this.UPPER_MASK) | (this.mt[kk + 1] & this.LOWER_MASK)
-        this.mt[kk] = this.mt[kk + (this.M - this.N)] ^ (y >>> 1) ^ mag01[y & 0x1]
-      }
-      y = (this.mt[this.N - 1] & this.UPPER_MASK) | (this.mt[0] & this.LOWER_MASK)
-      this.mt[this.N - 1] = this.mt[this.M - 1] ^ (y >>> 1) ^ mag01[y & 0x1]
+  _genInt32() {
+    if (this.mti >= N) {
+      this._twist()
       this.mti = 0
     }
-
-    y = this.mt[this.mti]
+    const y = this.mt[this.mti]
     this.mti += 1
-
-    y ^= y >>> 11
-    y ^= (y << 7) & 0x9d2c5680
-    y ^= (y << 15) & 0xefc60000
-    y ^= y >>> 18
-
-    return y >>> 0
+    return temper(y)
   }
 
   randomSample() {
@@ -84,14 +114,32 @@ export class MT19937 {
     return (a * 67108864 + b) / 9007199254740992
   }
 
-  rand(size) {
-    const out = new Array(size)
-    for (let i = 0; i < size; i += 1) {
-      out[i] = this.randomSample()
+  fillRandomSample(out, start = 0, end = out.length) {
+    const mt = this.mt
+    let mti = this.mti
+    for (let i = start; i < end; i += 1) {
+      if (mti >= N) {
+        this._twist()
+        mti = 0
+      }
+      const a = temper(mt[mti]) >>> 5
+      mti += 1
+      if (mti >= N) {
+        this._twist()
+        mti = 0
+      }
+      const b = temper(mt[mti]) >>> 6
+      mti += 1
+      out[i] = (a * 67108864 + b) / 9007199254740992
     }
+    this.mti = mti
     return out
   }
 
+  rand(size) {
+    return this.fillRandomSample(new Float64Array(size))
+  }
+
   uniform(low, high) {
     return low + (high - low) * this.randomSample()
   }
@@ -99,4 +147,8 @@ export class MT19937 {
   choiceWeighted(probabilities, size) {
     return randomChoiceIndicesByWeights(this, probabilities, size)
   }
+
+  choiceCumulative(cumulative, size) {
+    return randomChoiceIndicesByCumulative(this, cumulative, size)
+  }
 }
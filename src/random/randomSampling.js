@@ -23,12 +23,10 @@ export function adjustIntUniformHigh(low, high, step) {
 
 export function randomSampleFromDistribution(rng, distribution) {
   if (distribution instanceof CategoricalDistribution) {
+    const draws = rng.rand(distribution.choices.length)
     let bestIdx = 0
-    let bestValue = rng.uniform(0, 1)
-    for (let i = 1; i < distribution.choices.length; i += 1) {
-      const v = rng.uniform(0, 1)
-      if (v > bestValue) {
-        bestValue = v
+    for (let i = 1; i < draws.length; i += 1) {
+      if (draws[i] > draws[bestIdx]) {
         bestIdx = i
       }
     }
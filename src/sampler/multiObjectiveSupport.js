@@ -0,0 +1,50 @@
+let multiObjectiveSupport = null
+let loadError = null
+let loading = null
+
+export function registerMultiObjectiveSupport(support) {
+  multiObjectiveSupport = support
+  loadError = null
+}
+
+export function hasMultiObjectiveSupport() {
+  return multiObjectiveSupport !== null
+}
+
+export function getMultiObjectiveSupport() {
+  if (multiObjectiveSupport !== null) {
+    return multiObjectiveSupport
+  }
+  if (loadError !== null) {
+    throw new Error(`Multi-objective support failed to load: ${loadError.message}`, {
+      cause: loadError
+    })
+  }
+  throw new Error(
+    'Multi-objective support is not loaded. Import "optuna-tpe-js/multi-objective" or await study.ready before sampling a multi-objective study.'
+  )
+}
+
+export function loadMultiObjectiveSupport() {
+  if (multiObjectiveSupport !== null) {
+    return Promise.resolve(multiObjectiveSupport)
+  }
+  if (loading === null) {
+    loading = import('../multiObjective/splitTrials.js')
+      .then((mod) => {
+        registerMultiObjectiveSupport({
+          splitCompleteTrialsMultiObjective: mod.splitCompleteTrialsMultiObjective,
+          calculateWeightsBelowForMultiObjective: mod.calculateWeightsBelowForMultiObjective
+        })
+        return multiObjectiveSupport
+      })
+      .catch((err) => {
+        loadError = err
+        throw err
+      })
+      .finally(() => {
+        loading = null
+      })
+  }
+  return loading
+}
@@ -0,0 +1,192 @@
+import { CONSTRAINTS_KEY } from '../core/constants.js'
+import { StudyDirection, TrialState } from '../core/enums.js'
+import { argSelectSmallest } from '../math/sorting.js'
+import { getMultiObjectiveSupport } from './multiObjectiveSupport.js'
+
+function partitionBySelection(trials, selected) {
+  const isBelow = new Uint8Array(trials.length)
+  const below = new Array(selected.length)
+  for (let i = 0; i < selected.length; i += 1) {
+    isBelow[selected[i]] = 1
+    below[i] = trials[selected[i]]
+  }
+  const above = []
+  for (let i = 0; i < trials.length; i += 1) {
+    if (isBelow[i] === 0) {
+      above.push(trials[i])
+    }
+  }
+  return [below, above]
+}
+
+function hasNaN(values) {
+  for (let i = 0; i < values.length; i += 1) {
+    if (Number.isNaN(values[i])) return true
+  }
+  return false
+}
+
+export function splitCompleteTrialsSingleObjective(trials, study, nBelow) {
+  const sign = study.direction === StudyDirection.MINIMIZE ? 1 : -1
+  const keys = new Float64Array(trials.length)
+  for (let i = 0; i < trials.length; i += 1) {
+    keys[i] = sign * trials[i].value
+  }
+
+  if (hasNaN(keys)) {
+    const sorted = [...trials].sort((a, b) => {
+      if (study.direction === StudyDirection.MINIMIZE) {
+        return a.value - b.value
+      }
+      return b.value - a.value
+    })
+    return [sorted.slice(0, nBelow), sorted.slice(nBelow)]
+  }
+
+  const selected = argSelectSmallest(trials.length, nBelow, (i, j) => keys[i] - keys[j])
+  return partitionBySelection(trials, selected)
+}
+
+export function splitCompleteTrials(trials, study, nBelow) {
+  const clipped = Math.min(nBelow, trials.length)
+  if (study.directions.length <= 1) {
+    return splitCompleteTrialsSingleObjective(trials, study, clipped)
+  }
+  return getMultiObjectiveSupport().splitCompleteTrialsMultiObjective(trials, study, clipped)
+}
+
+function prunedTrialScoreFromLast(step, val, study) {
+  if (Number.isNaN(val)) {
+    return [-step, Infinity]
+  }
+  if (study.direction === StudyDirection.MINIMIZE) {
+    return [-step, val]
+  }
+  return [-step, -val]
+}
+
+export function getPrunedTrialScore(trial, study) {
+  const store = study.intermediateValueStore
+  if (store !== undefined && store.has(trial.number)) {
+    return prunedTrialScoreFromLast(store.lastStep(trial.number), store.lastValue(trial.number), study)
+  }
+
+  const entries = Object.entries(trial.intermediate_values)
+  if (entries.length > 0) {
+    entries.sort((a, b) => Number(a[0]) - Number(b[0]))
+    const [stepRaw, val] = entries[entries.length - 1]
+    return prunedTrialScoreFromLast(Number(stepRaw), val, study)
+  }
+  return [1, 0]
+}
+
+export function splitPrunedTrials(trials, study, nBelow) {
+  const clipped = Math.min(nBelow, trials.length)
+  const stepKeys = new Float64Array(trials.length)
+  const valueKeys = new Float64Array(trials.length)
+  for (let i = 0; i < trials.length; i += 1) {
+    const score = getPrunedTrialScore(trials[i], study)
+    stepKeys[i] = score[0]
+    valueKeys[i] = score[1]
+  }
+
+  const compare = (i, j) => {
+    if (stepKeys[i] !== stepKeys[j]) return stepKeys[i] - stepKeys[j]
+    return valueKeys[i] - valueKeys[j]
+  }
+  if (hasNaN(stepKeys) || hasNaN(valueKeys)) {
+    const order = Array.from({ length: trials.length }, (_, i) => i).sort(compare)
+    const sorted = order.map((i) => trials[i])
+    return [sorted.slice(0, clipped), sorted.slice(clipped)]
+  }
+
+  return partitionBySelection(trials, argSelectSmallest(trials.length, clipped, compare))
+}
+
+export function getInfeasibleTrialScore(trial, study = null) {
+  const store = study?.constraintViolationStore
+  if (store !== undefined && store.has(trial.number)) {
+    return store.violation(trial.number)
+  }
+  const constraint = trial.system_attrs[CONSTRAINTS_KEY]
+  if (constraint === undefined || constraint === null) {
+    return Infinity
+  }
+  let s = 0
+  for (const v of constraint) {
+    if (v > 0) s += v
+  }
+  return s
+}
+
+export function splitInfeasibleTrials(trials, nBelow, study = null) {
+  const clipped = Math.min(nBelow, trials.length)
+  const keys = new Float64Array(trials.length)
+  for (let i = 0; i < trials.length; i += 1) {
+    keys[i] = getInfeasibleTrialScore(trials[i], study)
+  }
+  const compare = (i, j) => keys[i] - keys[j]
+  if (hasNaN(keys)) {
+    const order = Array.from({ length: trials.length }, (_, i) => i).sort(compare)
+    const sorted = order.map((i) => trials[i])
+    return [sorted.slice(0, clipped), sorted.slice(clipped)]
+  }
+
+  return partitionBySelection(trials, argSelectSmallest(trials.length, clipped, compare))
+}
+
+function isSortedByNumber(trials) {
+  for (let i = 1; i < trials.length; i += 1) {
+    if (trials[i - 1].number > trials[i].number) return false
+  }
+  return true
+}
+
+export function splitTrials(study, trials, nBelow, constraintsEnabled) {
+  const complete = []
+  const pruned = []
+  const running = []
+  const infeasible = []
+
+  for (const trial of trials) {
+    if (trial.state === TrialState.RUNNING) {
+      running.push(trial)
+    } else if (constraintsEnabled && getInfeasibleTrialScore(trial, study) > 0) {
+      infeasible.push(trial)
+    } else if (trial.state === TrialState.COMPLETE) {
+      complete.push(trial)
+    } else if (trial.state === TrialState.PRUNED) {
+      pruned.push(trial)
+    } else {
+      throw new Error(`Unexpected trial state in split: ${trial.state}`)
+    }
+  }
+
+  const [belowComplete, aboveComplete] = splitCompleteTrials(complete, study, nBelow)
+  let remaining = Math.max(0, nBelow - belowComplete.length)
+  const [belowPruned, abovePruned] = splitPrunedTrials(pruned, study, remaining)
+  remaining = Math.max(0, remaining - belowPruned.length)
+  const [belowInfeasible, aboveInfeasible] = splitInfeasibleTrials(infeasible, remaining, study)
+
+  if (!isSortedByNumber(trials)) {
+    const below = [...belowComplete, ...belowPruned, ...belowInfeasible].sort(
+      (a, b) => a.number - b.number
+    )
+    const above = [...aboveComplete, ...abovePruned, ...aboveInfeasible, ...running].sort(
+      (a, b) => a.number - b.number
+    )
+    return [below, above]
+  }
+
+  const belowSet = new Set([...belowComplete, ...belowPruned, ...belowInfeasible])
+  const below = []
+  const above = []
+  for (const trial of trials) {
+    if (belowSet.has(trial)) {
+      below.push(trial)
+    } else {
+      above.push(trial)
+    }
+  }
+  return [below, above]
+}
@@ -5,7 +5,6 @@ import {
   CategoricalDistribution,
   IntDistribution
 } from '../distributions/distributions.js'
-import { calculateWeightsBelowForMultiObjective, splitTrials } from '../multiObjective/splitTrials.js'
 import {
   ParzenEstimator,
   defaultGamma,
@@ -15,10 +14,22 @@ import { MT19937 } from '../random/mt19937.js'
 import { RandomSampler } from '../random/randomSampler.js'
 import { GroupDecomposedSearchSpace } from '../searchSpace/groupDecomposedSearchSpace.js'
 import { IntersectionSearchSpace } from '../searchSpace/intersectionSearchSpace.js'
+import {
+  registerSamplerSnapshotCodec,
+  resolveCategoricalDistanceSpec,
+  resolveFunctionSpec,
+  resolveOptionalFunctionSpec,
+  restoreRngStateFromSnapshot,
+  serializeCategoricalDistanceSpec,
+  serializeFunctionSpec,
+  serializeOptionalFunctionSpec,
+  serializeRngStateForSnapshot
+} from '../study/snapshotCodec.js'
 import { isFinishedState } from '../study/trialStateUtils.js'
+import { getMultiObjectiveSupport, loadMultiObjectiveSupport } from './multiObjectiveSupport.js'
+import { splitTrials } from './splitTrials.js'
 
 export function processConstraintsAfterTrial(constraintsFunc, study, trial, state) {
-  void study
   if (state !== TrialState.COMPLETE && state !== TrialState.PRUNED) {
     return
   }
@@ -34,6 +45,7 @@ export function processConstraintsAfterTrial(constraintsFunc, study, trial, stat
     constraints = [...raw]
   } finally {
     trial.system_attrs[CONSTRAINTS_KEY] = constraints
+    study.constraintViolationStore?.record(trial.number, constraints)
   }
 }
 
@@ -78,6 +90,7 @@ export class TPESampler {
     this.searchSpace = new IntersectionSearchSpace(true)
     this.constantLiar = constantLiar
     this.constraintsFunc = constraintsFunc
+    this.parzenEstimatorCache = { study: null, version: -1, entries: new Map() }
 
     if (group && !multivariate) {
       throw new Error('group=true requires multivariate=true.')
@@ -87,6 +100,19 @@ export class TPESampler {
     }
   }
 
+  prepareStudy(study) {
+    if (study.isMultiObjective()) {
+      return loadMultiObjectiveSupport()
+    }
+    return undefined
+  }
+
+  checkStudy(study) {
+    if (study.isMultiObjective()) {
+      getMultiObjectiveSupport()
+    }
+  }
+
   reseedRng() {
     this.rng.seed((Date.now() >>> 0) ^ 0x7f4a7c15)
     this.randomSampler.reseedRng()
@@ -236,7 +262,7 @@ export class TPESampler {
         const params = this._getParams(trial)
         return Object.keys(searchSpace).every((key) => key in params)
       })
-      const weightsBelow = calculateWeightsBelowForMultiObjective(
+      const weightsBelow = getMultiObjectiveSupport().calculateWeightsBelowForMultiObjective(
         study,
         trials,
         this.constraintsFunc
@@ -287,11 +313,48 @@ export class TPESampler {
     return out
   }
 
-  _sample(study, trial, searchSpace, useTrialCache) {
+  _getCachedParzenEstimators(study, searchSpace) {
+    const cache = this.parzenEstimatorCache
+    if (cache.study !== study || cache.version !== study.trialsVersion) {
+      return null
+    }
+    const entry = cache.entries.get(Object.keys(searchSpace).join('\u0000'))
+    if (entry === undefined) {
+      return null
+    }
+    for (const [name, distribution] of Object.entries(searchSpace)) {
+      if (!entry.searchSpace[name].equals(distribution)) {
+        return null
+      }
+    }
+    return entry
+  }
+
+  _setCachedParzenEstimators(study, searchSpace, entry) {
+    const cache = this.parzenEstimatorCache
+    if (cache.study !== study || cache.version !== study.trialsVersion) {
+      cache.study = study
+      cache.version = study.trialsVersion
+      cache.entries = new Map()
+    }
+    cache.entries.set(Object.keys(searchSpace).join('\u0000'), entry)
+  }
+
+  _getParzenEstimators(study, trial, searchSpace, useTrialCache) {
     const states = this.constantLiar
       ? [TrialState.COMPLETE, TrialState.PRUNED, TrialState.RUNNING]
       : [TrialState.COMPLETE, TrialState.PRUNED]
 
+    const cacheable = !this.constantLiar && typeof study.trialsVersion === 'number'
+    if (cacheable) {
+      if (study.storage) {
+        study._syncFromStorage()
+      }
+      const cached = this._getCachedParzenEstimators(study, searchSpace)
+      if (cached !== null) {
+        return cached
+      }
+    }
     let trials = study.getTrials({ states, useCache: useTrialCache })
     if (this.constantLiar) {
       trials = trials.filter((t) => t.number !== trial.number)
@@ -305,8 +368,25 @@ export class TPESampler {
       this.constraintsFunc !== null
     )
 
-    const mpeBelow = this._buildParzenEstimator(study, searchSpace, belowTrials, true)
-    const mpeAbove = this._buildParzenEstimator(study, searchSpace, aboveTrials, false)
+    const entry = {
+      searchSpace,
+      n,
+      mpeBelow: this._buildParzenEstimator(study, searchSpace, belowTrials, true),
+      mpeAbove: this._buildParzenEstimator(study, searchSpace, aboveTrials, false)
+    }
+    if (cacheable) {
+      this._setCachedParzenEstimators(study, searchSpace, entry)
+    }
+    return entry
+  }
+
+  _sample(study, trial, searchSpace, useTrialCache) {
+    const { n, mpeBelow, mpeAbove } = this._getParzenEstimators(
+      study,
+      trial,
+      searchSpace,
+      useTrialCache
+    )
 
     const samplesBelow = mpeBelow.sample(this.rng, this.nEiCandidates)
     const acq = this._computeAcquisitionFunc(samplesBelow, mpeBelow, mpeAbove)
@@ -487,3 +567,81 @@ export class TPESampler {
 export function createTPESampler(options = {}) {
   return new TPESampler(options)
 }
+
+export function serializeTPESamplerForSnapshot(sampler) {
+  return {
+    config: {
+      priorWeight: sampler.parzenEstimatorParameters.priorWeight,
+      considerMagicClip: sampler.parzenEstimatorParameters.considerMagicClip,
+      considerEndpoints: sampler.parzenEstimatorParameters.considerEndpoints,
+      nStartupTrials: sampler.nStartupTrials,
+      nEiCandidates: sampler.nEiCandidates,
+      multivariate: sampler.multivariate,
+      group: sampler.group,
+      warnIndependentSampling: sampler.warnIndependentSampling,
+      constantLiar: sampler.constantLiar,
+      gamma: serializeFunctionSpec(sampler.gamma, defaultGamma, 'defaultGamma'),
+      weights: serializeFunctionSpec(
+        sampler.parzenEstimatorParameters.weights,
+        defaultWeights,
+        'defaultWeights'
+      ),
+      constraintsFunc: serializeOptionalFunctionSpec(sampler.constraintsFunc),
+      categoricalDistanceFunc: serializeCategoricalDistanceSpec(
+        sampler.parzenEstimatorParameters.categoricalDistanceFunc
+      )
+    },
+    rngState: serializeRngStateForSnapshot(sampler.rng),
+    randomSamplerRngState: serializeRngStateForSnapshot(sampler.randomSampler.rng)
+  }
+}
+
+export function deserializeTPESamplerFromSnapshot(payload, options = {}) {
+  const functions = (options && options.samplerFunctions) || {}
+  const config = payload.config || {}
+  const sampler = new TPESampler({
+    priorWeight: config.priorWeight,
+    considerMagicClip: !!config.considerMagicClip,
+    considerEndpoints: !!config.considerEndpoints,
+    nStartupTrials: config.nStartupTrials,
+    nEiCandidates: config.nEiCandidates,
+    gamma: resolveFunctionSpec(
+      config.gamma,
+      defaultGamma,
+      'defaultGamma',
+      functions.gamma,
+      'gamma'
+    ),
+    weights: resolveFunctionSpec(
+      config.weights,
+      defaultWeights,
+      'defaultWeights',
+      functions.weights,
+      'weights'
+    ),
+    seed: 0,
+    multivariate: !!config.multivariate,
+    group: !!config.group,
+    warnIndependentSampling: !!config.warnIndependentSampling,
+    constantLiar: !!config.constantLiar,
+    constraintsFunc: resolveOptionalFunctionSpec(
+      config.constraintsFunc,
+      functions.constraintsFunc,
+      'constraintsFunc'
+    ),
+    categoricalDistanceFunc: resolveCategoricalDistanceSpec(
+      config.categoricalDistanceFunc,
+      functions.categoricalDistanceFunc
+    )
+  })
+
+  restoreRngStateFromSnapshot(sampler.rng, payload.rngState)
+  restoreRngStateFromSnapshot(sampler.randomSampler.rng, payload.randomSamplerRngState)
+  return sampler
+}
+
+registerSamplerSnapshotCodec('TPESampler', {
+  matches: (sampler) => sampler instanceof TPESampler,
+  serialize: serializeTPESamplerForSnapshot,
+  deserialize: deserializeTPESamplerFromSnapshot
+})
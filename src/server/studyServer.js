@@ -0,0 +1,310 @@
+import fs from 'node:fs'
+import http from 'node:http'
+import { TrialState } from '../core/enums.js'
+import { isPlainObject } from '../core/objectUtils.js'
+import '../entries/multiObjective.js'
+import {
+  deserializeJsonValueFromSnapshot,
+  serializeJsonValueForSnapshot
+} from '../core/snapshotJson.js'
+import {
+  deserializeDistributionFromSnapshot,
+  serializeDistributionForSnapshot
+} from '../study/snapshotCodec.js'
+import '../sampler/tpeSampler.js'
+import { Study } from '../study/study.js'
+
+const TELL_STATES = [TrialState.COMPLETE, TrialState.PRUNED, TrialState.FAIL]
+
+export function loadStudySnapshotFile(snapshotPath, options = {}) {
+  if (!fs.existsSync(snapshotPath)) {
+    return null
+  }
+  return Study.parse(fs.readFileSync(snapshotPath, 'utf8'), options)
+}
+
+export function writeStudySnapshotFile(study, snapshotPath) {
+  const tmpPath = `${snapshotPath}.${process.pid}.tmp`
+  fs.writeFileSync(tmpPath, JSON.stringify(study.serialize()))
+  fs.renameSync(tmpPath, snapshotPath)
+}
+
+function readJsonBody(req) {
+  return new Promise((resolve, reject) => {
+    const chunks = []
+    req.on('data', (chunk) => chunks.push(chunk))
+    req.on('error', reject)
+    req.on('end', () => {
+      if (chunks.length === 0) {
+        resolve({})
+        return
+      }
+      try {
+        resolve(JSON.parse(Buffer.concat(chunks).toString('utf8')))
+      } catch {
+        reject(new Error('Request body must be valid JSON.'))
+      }
+    })
+  })
+}
+
+function sendJson(res, status, payload) {
+  const body = JSON.stringify(payload)
+  res.writeHead(status, {
+    'content-type': 'application/json',
+    'content-length': Buffer.byteLength(body)
+  })
+  res.end(body)
+}
+
+export class StudyServer {
+  constructor({
+    study,
+    snapshotPath = null,
+    batchWindowMs = 5,
+    onSnapshotError = (err) => console.error(`StudyServer: failed to write snapshot: ${err.message}`)
+  }) {
+    if (!(study instanceof Study)) {
+      throw new Error('StudyServer expects an instance of Study.')
+    }
+    this.study = study
+    this.snapshotPath = snapshotPath
+    this.batchWindowMs = batchWindowMs
+    this.onSnapshotError = onSnapshotError
+    this.snapshotError = null
+    this.pendingTells = []
+    this.pendingAsks = []
+    this.flushTimer = null
+    this.server = http.createServer((req, res) => {
+      this._handleRequest(req, res).catch((err) => sendJson(res, 400, { error: err.message }))
+    })
+  }
+
+  listen(target) {
+    return new Promise((resolve, reject) => {
+      this.server.once('error', reject)
+      this.server.listen(target, () => {
+        this.server.off('error', reject)
+        resolve(this.server.address())
+      })
+    })
+  }
+
+  close() {
+    if (this.flushTimer !== null) {
+      clearTimeout(this.flushTimer)
+      this.flush()
+    }
+    return new Promise((resolve, reject) => {
+      this.server.close((err) => (err ? reject(err) : resolve()))
+    })
+  }
+
+  async _handleRequest(req, res) {
+    if (req.method === 'GET' && req.url === '/snapshot') {
+      sendJson(res, 200, this.study.serialize())
+      return
+    }
+    if (req.method !== 'POST' || (req.url !== '/ask' && req.url !== '/tell')) {
+      sendJson(res, 404, { error: `Unknown endpoint ${req.method} ${req.url}.` })
+      return
+    }
+
+    const body = await readJsonBody(req)
+    if (!isPlainObject(body)) {
+      throw new Error('Request body must be a JSON object.')
+    }
+    if (req.url === '/ask') {
+      this.pendingAsks.push({ body, res })
+    } else {
+      this.pendingTells.push({ body, res })
+    }
+    this._scheduleFlush()
+  }
+
+  _scheduleFlush() {
+    if (this.flushTimer !== null) {
+      return
+    }
+    this.flushTimer = setTimeout(() => {
+      this.flushTimer = null
+      this.flush()
+    }, this.batchWindowMs)
+  }
+
+  flush() {
+    const tells = this.pendingTells
+    const asks = this.pendingAsks
+    this.pendingTells = []
+    this.pendingAsks = []
+
+    for (const { body, res } of tells) {
+      try {
+        sendJson(res, 200, this._tell(body))
+      } catch (err) {
+        sendJson(res, 400, { error: err.message })
+      }
+    }
+    for (const { body, res } of asks) {
+      try {
+        sendJson(res, 200, this._ask(body))
+      } catch (err) {
+        sendJson(res, 400, { error: err.message })
+      }
+    }
+
+    if (this.snapshotPath !== null && tells.length + asks.length > 0) {
+      try {
+        writeStudySnapshotFile(this.study, this.snapshotPath)
+        this.snapshotError = null
+      } catch (err) {
+        this.snapshotError = err
+        this.onSnapshotError(err)
+      }
+    }
+  }
+
+  _ask(body) {
+    if (body.distributions !== undefined && !isPlainObject(body.distributions)) {
+      throw new Error('Ask request "distributions" must be an object.')
+    }
+    const distributions = Object.entries(body.distributions ?? {}).map(([name, payload]) => [
+      name,
+      deserializeDistributionFromSnapshot(payload)
+    ])
+    const trial = this.study.ask()
+    try {
+      for (const [name, distribution] of distributions) {
+        trial._suggest(name, distribution)
+      }
+    } catch (err) {
+      this.study.tell(trial, { state: TrialState.FAIL })
+      throw err
+    }
+    return {
+      number: trial.number,
+      params: serializeJsonValueForSnapshot(trial.frozen.params)
+    }
+  }
+
+  _tell(body) {
+    const state = body.state ?? null
+    if (state !== null && !TELL_STATES.includes(state)) {
+      throw new Error(`Invalid tell state ${JSON.stringify(state)}. Expected one of ${TELL_STATES.join(', ')}.`)
+    }
+    const frozen = this.study.trials[body.number]
+    if (frozen === undefined) {
+      throw new Error(`Unknown trial number ${body.number}.`)
+    }
+    if (frozen.state !== TrialState.RUNNING) {
+      throw new Error(`Trial ${body.number} is not running (state "${frozen.state}").`)
+    }
+    this.study.tell(frozen, {
+      value: body.value === undefined ? null : deserializeJsonValueFromSnapshot(body.value),
+      values: body.values === undefined ? null : deserializeJsonValueFromSnapshot(body.values),
+      state
+    })
+    return { number: frozen.number, state: frozen.state }
+  }
+}
+
+export function createStudyServer({
+  study = null,
+  createStudy = null,
+  snapshotPath = null,
+  samplerFunctions = undefined,
+  batchWindowMs = 5,
+  onSnapshotError = undefined
+} = {}) {
+  let resolved = snapshotPath === null ? null : loadStudySnapshotFile(snapshotPath, { samplerFunctions })
+  if (resolved === null) {
+    resolved = study !== null ? study : createStudy?.()
+  }
+  if (!(resolved instanceof Study)) {
+    throw new Error('createStudyServer requires a study, a createStudy function, or an existing snapshot.')
+  }
+  return new StudyServer({ study: resolved, snapshotPath, batchWindowMs, onSnapshotError })
+}
+
+function resolveRequestTarget(target) {
+  if (typeof target === 'number') {
+    return { hostname: '127.0.0.1', port: target }
+  }
+  if (typeof target === 'string' && /^https?:/.test(target)) {
+    const url = new URL(target)
+    return { hostname: url.hostname, port: url.port }
+  }
+  return { socketPath: target }
+}
+
+export class StudyClient {
+  constructor(target) {
+    this.requestOptions = resolveRequestTarget(target)
+    this.agent = new http.Agent({ keepAlive: true })
+  }
+
+  close() {
+    this.agent.destroy()
+  }
+
+  _request(method, path, payload = null) {
+    return new Promise((resolve, reject) => {
+      const body = payload === null ? null : JSON.stringify(payload)
+      const req = http.request(
+        {
+          ...this.requestOptions,
+          agent: this.agent,
+          method,
+          path,
+          headers: body === null ? {} : { 'content-type': 'application/json' }
+        },
+        (res) => {
+          const chunks = []
+          res.on('data', (chunk) => chunks.push(chunk))
+          res.on('error', reject)
+          res.on('end', () => {
+            let parsed
+            try {
+              parsed = JSON.parse(Buffer.concat(chunks).toString('utf8'))
+            } catch {
+              reject(new Error(`Study server responded with invalid JSON (status ${res.statusCode}).`))
+              return
+            }
+            if (res.statusCode !== 200) {
+              reject(new Error(parsed.error || `Study server responded with ${res.statusCode}.`))
+              return
+            }
+            resolve(parsed)
+          })
+        }
+      )
+      req.on('error', reject)
+      req.end(body === null ? undefined : body)
+    })
+  }
+
+  async ask(distributions = {}) {
+    const payload = {}
+    for (const [name, distribution] of Object.entries(distributions)) {
+      payload[name] = serializeDistributionForSnapshot(distribution)
+    }
+    const response = await this._request('POST', '/ask', { distributions: payload })
+    return {
+      number: response.number,
+      params: deserializeJsonValueFromSnapshot(response.params)
+    }
+  }
+
+  tell(number, { value = undefined, values = undefined, state = undefined } = {}) {
+    return this._request('POST', '/tell', {
+      number,
+      value: value === undefined ? undefined : serializeJsonValueForSnapshot(value),
+      values: values === undefined ? undefined : serializeJsonValueForSnapshot(values),
+      state
+    })
+  }
+
+  snapshot() {
+    return this._request('GET', '/snapshot')
+  }
+}
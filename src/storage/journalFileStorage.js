@@ -0,0 +1,197 @@
+import { randomUUID } from 'node:crypto'
+import fs from 'node:fs'
+
+const NEWLINE = 0x0a
+const sleepCell = new Int32Array(new SharedArrayBuffer(4))
+
+function sleepSync(ms) {
+  Atomics.wait(sleepCell, 0, 0, ms)
+}
+
+export class JournalFileStorage {
+  constructor(filePath, { lockTimeoutMs = 30000, staleLockMs = 60000, retryIntervalMs = 2 } = {}) {
+    if (typeof filePath !== 'string' || filePath.length === 0) {
+      throw new Error('JournalFileStorage: filePath must be a non-empty string.')
+    }
+    this.filePath = filePath
+    this.lockPath = `${filePath}.lock`
+    this.lockTimeoutMs = lockTimeoutMs
+    this.staleLockMs = staleLockMs
+    this.retryIntervalMs = retryIntervalMs
+    this.offset = 0
+    this.lockDepth = 0
+    this.lockToken = null
+    fs.closeSync(fs.openSync(filePath, 'a'))
+  }
+
+  _readLockToken() {
+    try {
+      return fs.readFileSync(this.lockPath, 'utf8')
+    } catch (err) {
+      if (err.code === 'ENOENT') {
+        return null
+      }
+      throw err
+    }
+  }
+
+  _acquireLock() {
+    const deadline = Date.now() + this.lockTimeoutMs
+    const token = `${process.pid}:${randomUUID()}`
+    for (;;) {
+      try {
+        const fd = fs.openSync(this.lockPath, 'wx')
+        try {
+          fs.writeSync(fd, token)
+        } finally {
+          fs.closeSync(fd)
+        }
+        this.lockToken = token
+        return
+      } catch (err) {
+        if (err.code !== 'EEXIST') {
+          throw err
+        }
+      }
+
+      let stat = null
+      try {
+        stat = fs.statSync(this.lockPath)
+      } catch (err) {
+        if (err.code !== 'ENOENT') {
+          throw err
+        }
+        continue
+      }
+      if (Date.now() - stat.mtimeMs > this.staleLockMs) {
+        this._removeStaleLock(stat)
+        continue
+      }
+      if (Date.now() > deadline) {
+        throw new Error(`Timed out waiting for journal lock "${this.lockPath}".`)
+      }
+      sleepSync(this.retryIntervalMs)
+    }
+  }
+
+  _removeStaleLock(stat) {
+    const stalePath = `${this.lockPath}.${process.pid}.${randomUUID()}.stale`
+    try {
+      fs.renameSync(this.lockPath, stalePath)
+    } catch (err) {
+      if (err.code === 'ENOENT') {
+        return
+      }
+      throw err
+    }
+    const moved = fs.statSync(stalePath)
+    if (moved.ino !== stat.ino || moved.mtimeMs !== stat.mtimeMs) {
+      try {
+        fs.linkSync(stalePath, this.lockPath)
+      } catch (err) {
+        if (err.code !== 'EEXIST') {
+          throw err
+        }
+      }
+    }
+    fs.rmSync(stalePath, { force: true })
+  }
+
+  _assertLockOwned() {
+    if (this.lockToken === null || this._readLockToken() !== this.lockToken) {
+      throw new Error(
+        `JournalFileStorage: lock "${this.lockPath}" is no longer held by this process (taken over as stale).`
+      )
+    }
+  }
+
+  _releaseLock() {
+    const token = this.lockToken
+    this.lockToken = null
+    if (token !== null && this._readLockToken() === token) {
+      fs.rmSync(this.lockPath, { force: true })
+    }
+  }
+
+  _truncateTail(size) {
+    this._assertLockOwned()
+    fs.truncateSync(this.filePath, size)
+  }
+
+  withLock(fn) {
+    if (this.lockDepth === 0) {
+      this._acquireLock()
+    }
+    this.lockDepth += 1
+    try {
+      return fn()
+    } finally {
+      this.lockDepth -= 1
+      if (this.lockDepth === 0) {
+        this._releaseLock()
+      }
+    }
+  }
+
+  readOps() {
+    const size = fs.statSync(this.filePath).size
+    if (size <= this.offset) {
+      return []
+    }
+
+    const buffer = Buffer.alloc(size - this.offset)
+    const fd = fs.openSync(this.filePath, 'r')
+    let bytesRead = 0
+    try {
+      while (bytesRead < buffer.length) {
+        const n = fs.readSync(fd, buffer, bytesRead, buffer.length - bytesRead, this.offset + bytesRead)
+        if (n === 0) break
+        bytesRead += n
+      }
+    } finally {
+      fs.closeSync(fd)
+    }
+
+    const end = bytesRead === 0 ? -1 : buffer.lastIndexOf(NEWLINE, bytesRead - 1)
+    if (end + 1 < bytesRead && this.lockDepth > 0) {
+      this._truncateTail(this.offset + end + 1)
+    }
+    if (end === -1) {
+      return []
+    }
+    this.offset += end + 1
+
+    const ops = []
+    for (const line of buffer.toString('utf8', 0, end).split('\n')) {
+      if (line.length > 0) {
+        ops.push(JSON.parse(line))
+      }
+    }
+    return ops
+  }
+
+  appendOps(ops) {
+    if (this.lockDepth === 0) {
+      throw new Error('JournalFileStorage: appendOps must be called while holding the lock.')
+    }
+    if (ops.length === 0) {
+      return
+    }
+    this._assertLockOwned()
+    if (fs.statSync(this.filePath).size !== this.offset) {
+      throw new Error('JournalFileStorage: readOps must consume the journal before appending.')
+    }
+
+    const payload = Buffer.from(ops.map((op) => `${JSON.stringify(op)}\n`).join(''), 'utf8')
+    const fd = fs.openSync(this.filePath, 'a')
+    try {
+      let written = 0
+      while (written < payload.length) {
+        written += fs.writeSync(fd, payload, written, payload.length - written)
+      }
+    } finally {
+      fs.closeSync(fd)
+    }
+    this.offset += payload.length
+  }
+}
@@ -0,0 +1,95 @@
+import fs from 'node:fs'
+import {
+  deserializeJsonValueFromSnapshot,
+  serializeJsonValueForSnapshot
+} from '../core/snapshotJson.js'
+import { growTypedColumn } from '../core/typedColumns.js'
+
+function deepFreeze(value) {
+  if (value !== null && typeof value === 'object' && !Object.isFrozen(value)) {
+    for (const item of Object.values(value)) {
+      deepFreeze(item)
+    }
+    Object.freeze(value)
+  }
+  return value
+}
+
+export class TrialArchive {
+  constructor(filePath, { initialCapacity = 1024 } = {}) {
+    if (typeof filePath !== 'string' || filePath.length === 0) {
+      throw new Error('TrialArchive: filePath must be a non-empty string.')
+    }
+    this.filePath = filePath
+    this.fd = fs.openSync(filePath, 'w+')
+    this.size = 0
+    this.offsets = new Float64Array(initialCapacity).fill(-1)
+    this.lengths = new Float64Array(initialCapacity)
+    this.lastLoadedNumber = -1
+    this.lastLoadedRecord = null
+  }
+
+  _ensureCapacity(number) {
+    this.offsets = growTypedColumn(this.offsets, number, -1)
+    this.lengths = growTypedColumn(this.lengths, number)
+  }
+
+  has(number) {
+    return number < this.offsets.length && this.offsets[number] >= 0
+  }
+
+  store(number, record) {
+    if (this.fd === null) {
+      throw new Error('TrialArchive is closed.')
+    }
+    const payload = Buffer.from(`${JSON.stringify(serializeJsonValueForSnapshot(record))}\n`, 'utf8')
+    let written = 0
+    while (written < payload.length) {
+      written += fs.writeSync(this.fd, payload, written, payload.length - written, this.size + written)
+    }
+    this._ensureCapacity(number)
+    if (this.lastLoadedNumber === number) {
+      this.lastLoadedNumber = -1
+      this.lastLoadedRecord = null
+    }
+    this.offsets[number] = this.size
+    this.lengths[number] = payload.length - 1
+    this.size += payload.length
+  }
+
+  load(number) {
+    if (!this.has(number)) {
+      throw new Error(`Trial ${number} is not archived.`)
+    }
+    if (this.fd === null) {
+      throw new Error('TrialArchive is closed.')
+    }
+    if (this.lastLoadedNumber !== number) {
+      this.lastLoadedRecord = deepFreeze(this._readRecord(number))
+      this.lastLoadedNumber = number
+    }
+    return this.lastLoadedRecord
+  }
+
+  _readRecord(number) {
+    const buffer = Buffer.alloc(this.lengths[number])
+    let bytesRead = 0
+    while (bytesRead < buffer.length) {
+      const n = fs.readSync(this.fd, buffer, bytesRead, buffer.length - bytesRead, this.offsets[number] + bytesRead)
+      if (n === 0) {
+        throw new Error(`Archived record for trial ${number} is truncated.`)
+      }
+      bytesRead += n
+    }
+    return deserializeJsonValueFromSnapshot(JSON.parse(buffer.toString('utf8')))
+  }
+
+  close() {
+    if (this.fd !== null) {
+      fs.closeSync(this.fd)
+      this.fd = null
+      this.lastLoadedNumber = -1
+      this.lastLoadedRecord = null
+    }
+  }
+}
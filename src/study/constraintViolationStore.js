@@ -0,0 +1,50 @@
+import { growTypedColumn } from '../core/typedColumns.js'
+
+const RECORDED = 1
+const HAS_CONSTRAINTS = 2
+const FEASIBLE = 4
+
+export class ConstraintViolationStore {
+  constructor(capacity = 64) {
+    this.violations = new Float64Array(capacity)
+    this.flags = new Uint8Array(capacity)
+  }
+
+  _ensureCapacity(number) {
+    this.violations = growTypedColumn(this.violations, number)
+    this.flags = growTypedColumn(this.flags, number)
+  }
+
+  record(number, constraints) {
+    this._ensureCapacity(number)
+    if (constraints === undefined || constraints === null) {
+      this.violations[number] = Infinity
+      this.flags[number] = RECORDED
+      return
+    }
+    let s = 0
+    let feasible = true
+    for (const v of constraints) {
+      if (v > 0) s += v
+      if (!(v <= 0)) feasible = false
+    }
+    this.violations[number] = s
+    this.flags[number] = RECORDED | HAS_CONSTRAINTS | (feasible ? FEASIBLE : 0)
+  }
+
+  has(number) {
+    return number < this.flags.length && (this.flags[number] & RECORDED) !== 0
+  }
+
+  hasConstraints(number) {
+    return number < this.flags.length && (this.flags[number] & HAS_CONSTRAINTS) !== 0
+  }
+
+  isFeasible(number) {
+    return (this.flags[number] & FEASIBLE) !== 0
+  }
+
+  violation(number) {
+    return this.violations[number]
+  }
+}
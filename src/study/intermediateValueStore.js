@@ -0,0 +1,47 @@
+import { growTypedColumn } from '../core/typedColumns.js'
+
+export class IntermediateValueStore {
+  constructor(capacity = 64) {
+    this.lastSteps = new Float64Array(capacity).fill(Number.NaN)
+    this.lastValues = new Float64Array(capacity)
+  }
+
+  _ensureCapacity(number) {
+    this.lastSteps = growTypedColumn(this.lastSteps, number, Number.NaN)
+    this.lastValues = growTypedColumn(this.lastValues, number)
+  }
+
+  record(number, step, value) {
+    const s = Number(step)
+    if (Number.isNaN(s)) {
+      return
+    }
+    this._ensureCapacity(number)
+    const current = this.lastSteps[number]
+    if (Number.isNaN(current) || s >= current) {
+      this.lastSteps[number] = s
+      this.lastValues[number] = value
+    }
+  }
+
+  rebuild(number, intermediateValues) {
+    this._ensureCapacity(number)
+    this.lastSteps[number] = Number.NaN
+    this.lastValues[number] = 0
+    for (const [step, value] of Object.entries(intermediateValues || {})) {
+      this.record(number, step, value)
+    }
+  }
+
+  has(number) {
+    return number < this.lastSteps.length && !Number.isNaN(this.lastSteps[number])
+  }
+
+  lastStep(number) {
+    return this.lastSteps[number]
+  }
+
+  lastValue(number) {
+    return this.lastValues[number]
+  }
+}
@@ -9,10 +9,9 @@ import {
 import {
   CategoricalDistribution,
   FloatDistribution,
-  IntDistribution
+  IntDistribution,
+  internNewDistribution
 } from '../distributions/distributions.js'
-import { defaultGamma, defaultWeights } from '../parzen/parzenEstimator.js'
-import { TPESampler } from '../sampler/tpeSampler.js'
 
 export function serializeDistributionForSnapshot(distribution) {
   if (distribution instanceof FloatDistribution) {
@@ -48,29 +47,57 @@ export function deserializeDistributionFromSnapshot(payload) {
   }
 
   if (payload.type === 'FloatDistribution') {
-    return new FloatDistribution(
-      deserializeJsonValueFromSnapshot(payload.low),
-      deserializeJsonValueFromSnapshot(payload.high),
-      !!payload.log,
-      payload.step === null ? null : deserializeJsonValueFromSnapshot(payload.step)
+    return internNewDistribution(
+      new FloatDistribution(
+        deserializeJsonValueFromSnapshot(payload.low),
+        deserializeJsonValueFromSnapshot(payload.high),
+        !!payload.log,
+        payload.step === null ? null : deserializeJsonValueFromSnapshot(payload.step)
+      )
     )
   }
   if (payload.type === 'IntDistribution') {
-    return new IntDistribution(
-      deserializeJsonValueFromSnapshot(payload.low),
-      deserializeJsonValueFromSnapshot(payload.high),
-      !!payload.log,
-      deserializeJsonValueFromSnapshot(payload.step)
+    return internNewDistribution(
+      new IntDistribution(
+        deserializeJsonValueFromSnapshot(payload.low),
+        deserializeJsonValueFromSnapshot(payload.high),
+        !!payload.log,
+        deserializeJsonValueFromSnapshot(payload.step)
+      )
     )
   }
   if (payload.type === 'CategoricalDistribution') {
     const choices = (payload.choices || []).map((choice) => deserializeJsonValueFromSnapshot(choice))
-    return new CategoricalDistribution(choices)
+    return internNewDistribution(new CategoricalDistribution(choices))
   }
 
   throw new Error(`Unknown serialized distribution type "${payload.type}".`)
 }
 
+export function createDistributionTable() {
+  const payloads = []
+  const indices = new Map()
+  return {
+    payloads,
+    ref(distribution) {
+      let idx = indices.get(distribution)
+      if (idx === undefined) {
+        idx = payloads.length
+        payloads.push(serializeDistributionForSnapshot(distribution))
+        indices.set(distribution, idx)
+      }
+      return idx
+    }
+  }
+}
+
+export function deserializeDistributionTable(payloads) {
+  if (!Array.isArray(payloads)) {
+    throw new Error('Invalid study snapshot: missing distributions table.')
+  }
+  return payloads.map((payload) => deserializeDistributionFromSnapshot(payload))
+}
+
 export function serializeRngStateForSnapshot(rng) {
   return {
     mt: Array.from(rng.mt),
@@ -199,89 +226,41 @@ export function resolveCategoricalDistanceSpec(spec, overrideMap) {
   )
 }
 
+const samplerSnapshotCodecs = new Map()
+
+export function registerSamplerSnapshotCodec(samplerType, { matches, serialize, deserialize }) {
+  samplerSnapshotCodecs.set(samplerType, { matches, serialize, deserialize })
+}
+
 export function serializeSamplerForSnapshot(sampler) {
-  if (!(sampler instanceof TPESampler)) {
-    throw new Error('Only TPESampler serialization is currently supported.')
-  }
-  return {
-    samplerType: 'TPESampler',
-    config: {
-      priorWeight: sampler.parzenEstimatorParameters.priorWeight,
-      considerMagicClip: sampler.parzenEstimatorParameters.considerMagicClip,
-      considerEndpoints: sampler.parzenEstimatorParameters.considerEndpoints,
-      nStartupTrials: sampler.nStartupTrials,
-      nEiCandidates: sampler.nEiCandidates,
-      multivariate: sampler.multivariate,
-      group: sampler.group,
-      warnIndependentSampling: sampler.warnIndependentSampling,
-      constantLiar: sampler.constantLiar,
-      gamma: serializeFunctionSpec(sampler.gamma, defaultGamma, 'defaultGamma'),
-      weights: serializeFunctionSpec(
-        sampler.parzenEstimatorParameters.weights,
-        defaultWeights,
-        'defaultWeights'
-      ),
-      constraintsFunc: serializeOptionalFunctionSpec(sampler.constraintsFunc),
-      categoricalDistanceFunc: serializeCategoricalDistanceSpec(
-        sampler.parzenEstimatorParameters.categoricalDistanceFunc
-      )
-    },
-    rngState: serializeRngStateForSnapshot(sampler.rng),
-    randomSamplerRngState: serializeRngStateForSnapshot(sampler.randomSampler.rng)
+  for (const [samplerType, codec] of samplerSnapshotCodecs) {
+    if (codec.matches(sampler)) {
+      return { samplerType, ...codec.serialize(sampler) }
+    }
   }
+  throw new Error('Only TPESampler serialization is currently supported.')
 }
 
 export function deserializeSamplerFromSnapshot(payload, options = {}) {
-  if (!isPlainObject(payload) || payload.samplerType !== 'TPESampler') {
+  if (!isPlainObject(payload) || typeof payload.samplerType !== 'string') {
     throw new Error('Unsupported sampler snapshot payload.')
   }
-  const functions = (options && options.samplerFunctions) || {}
-  const config = payload.config || {}
-  const sampler = new TPESampler({
-    priorWeight: config.priorWeight,
-    considerMagicClip: !!config.considerMagicClip,
-    considerEndpoints: !!config.considerEndpoints,
-    nStartupTrials: config.nStartupTrials,
-    nEiCandidates: config.nEiCandidates,
-    gamma: resolveFunctionSpec(
-      config.gamma,
-      defaultGamma,
-      'defaultGamma',
-      functions.gamma,
-      'gamma'
-    ),
-    weights: resolveFunctionSpec(
-      config.weights,
-      defaultWeights,
-      'defaultWeights',
-      functions.weights,
-      'weights'
-    ),
-    seed: 0,
-    multivariate: !!config.multivariate,
-    group: !!config.group,
-    warnIndependentSampling: !!config.warnIndependentSampling,
-    constantLiar: !!config.constantLiar,
-    constraintsFunc: resolveOptionalFunctionSpec(
-      config.constraintsFunc,
-      functions.constraintsFunc,
-      'constraintsFunc'
-    ),
-    categoricalDistanceFunc: resolveCategoricalDistanceSpec(
-      config.categoricalDistanceFunc,
-      functions.categoricalDistanceFunc
+  const codec = samplerSnapshotCodecs.get(payload.samplerType)
+  if (codec === undefined) {
+    throw new Error(
+      `Sampler type "${payload.samplerType}" is not registered. Import its sampler module before deserializing the study.`
     )
-  })
-
-  restoreRngStateFromSnapshot(sampler.rng, payload.rngState)
-  restoreRngStateFromSnapshot(sampler.randomSampler.rng, payload.randomSamplerRngState)
-  return sampler
+  }
+  return codec.deserialize(payload, options)
 }
 
-export function serializeTrialForSnapshot(trial) {
+export function serializeTrialForSnapshot(trial, distributionTable = null) {
   const distributions = {}
   for (const [name, distribution] of Object.entries(trial.distributions || {})) {
-    distributions[name] = serializeDistributionForSnapshot(distribution)
+    distributions[name] =
+      distributionTable === null
+        ? serializeDistributionForSnapshot(distribution)
+        : distributionTable.ref(distribution)
   }
   return {
     number: trial.number,
@@ -295,13 +274,20 @@ export function serializeTrialForSnapshot(trial) {
   }
 }
 
-export function deserializeTrialFromSnapshot(payload) {
+export function deserializeTrialFromSnapshot(payload, distributionTable = null) {
   if (!isPlainObject(payload)) {
     throw new Error('Invalid trial payload in serialized study.')
   }
   const distributions = {}
   for (const [name, distributionPayload] of Object.entries(payload.distributions || {})) {
-    distributions[name] = deserializeDistributionFromSnapshot(distributionPayload)
+    if (typeof distributionPayload === 'number') {
+      if (distributionTable === null || distributionTable[distributionPayload] === undefined) {
+        throw new Error(`Unknown distribution reference ${distributionPayload} in serialized trial.`)
+      }
+      distributions[name] = distributionTable[distributionPayload]
+    } else {
+      distributions[name] = deserializeDistributionFromSnapshot(distributionPayload)
+    }
   }
   return {
     number: payload.number,
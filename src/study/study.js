@@ -1,14 +1,31 @@
-import { FIXED_PARAMS_KEY, STUDY_SNAPSHOT_MAGIC, STUDY_SNAPSHOT_VERSION } from '../core/constants.js'
+import {
+  CONSTRAINTS_KEY,
+  FIXED_PARAMS_KEY,
+  STUDY_SNAPSHOT_MAGIC,
+  STUDY_SNAPSHOT_VERSION,
+  SUPPORTED_STUDY_SNAPSHOT_VERSIONS
+} from '../core/constants.js'
 import { TrialState } from '../core/enums.js'
-import { isPlainObject } from '../core/objectUtils.js'
-import { cloneJsonValue } from '../core/snapshotJson.js'
+import { hasOwn, isPlainObject } from '../core/objectUtils.js'
+import {
+  cloneJsonValue,
+  deserializeJsonValueFromSnapshot,
+  serializeJsonValueForSnapshot
+} from '../core/snapshotJson.js'
 import {
+  createDistributionTable,
+  deserializeDistributionFromSnapshot,
+  deserializeDistributionTable,
   deserializeSamplerFromSnapshot,
   deserializeTrialFromSnapshot,
+  serializeDistributionForSnapshot,
   serializeSamplerForSnapshot,
   serializeTrialForSnapshot
 } from './snapshotCodec.js'
+import { ConstraintViolationStore } from './constraintViolationStore.js'
+import { IntermediateValueStore } from './intermediateValueStore.js'
 import { TrialRuntime } from './trialRuntime.js'
+import { isFinishedState } from './trialStateUtils.js'
 
 export function createFrozenTrial({
   number,
@@ -33,56 +50,250 @@ export function createFrozenTrial({
 }
 
 export class Study {
-  constructor({ sampler, directions }) {
+  constructor({ sampler, directions, storage = null, archive = null }) {
     this.sampler = sampler
     this.directions = directions
     this.direction = directions[0]
     this.trials = []
+    this.trialsVersion = 0
+    this.intermediateValueStore = new IntermediateValueStore()
+    this.constraintViolationStore = new ConstraintViolationStore()
+    this.waitingTrialNumbers = []
+    this.waitingTrialCursor = 0
+    this.storage = storage
+    this.archive = archive
+    this.ready = Promise.resolve(
+      typeof sampler?.prepareStudy === 'function' ? sampler.prepareStudy(this) : undefined
+    ).then(() => this)
+    this.ready.catch(() => undefined)
+
+    if (this.storage !== null) {
+      this.storage.withLock(() => {
+        const hasHeader = this._syncFromStorage()
+        if (!hasHeader) {
+          this.storage.appendOps([{ op: 'create_study', directions: this.directions.slice() }])
+        }
+      })
+    }
   }
 
   isMultiObjective() {
     return this.directions.length > 1
   }
 
-  enqueueTrial(params) {
-    if (!isPlainObject(params)) {
-      throw new Error('enqueueTrial expects params to be an object.')
+  _rebuildWaitingQueue() {
+    this.waitingTrialNumbers = []
+    this.waitingTrialCursor = 0
+    for (const trial of this.trials) {
+      if (trial.state === TrialState.WAITING) {
+        this.waitingTrialNumbers.push(trial.number)
+      }
     }
+  }
 
-    const frozen = createFrozenTrial({
-      number: this.trials.length,
-      state: TrialState.WAITING,
-      systemAttrs: {
-        [FIXED_PARAMS_KEY]: cloneJsonValue(params)
+  _popWaitingTrial() {
+    while (this.waitingTrialCursor < this.waitingTrialNumbers.length) {
+      const trial = this.trials[this.waitingTrialNumbers[this.waitingTrialCursor]]
+      this.waitingTrialCursor += 1
+      if (trial.state === TrialState.WAITING) {
+        return trial
       }
+    }
+    return null
+  }
+
+  _recordConstraintViolation(frozen) {
+    if (hasOwn(frozen.system_attrs || {}, CONSTRAINTS_KEY)) {
+      this.constraintViolationStore.record(frozen.number, frozen.system_attrs[CONSTRAINTS_KEY])
+    }
+  }
+
+  _archiveTrial(frozen) {
+    if (this.archive === null || !isFinishedState(frozen.state)) {
+      return
+    }
+
+    const number = frozen.number
+    const archive = this.archive
+    archive.store(number, {
+      intermediate_values: frozen.intermediate_values,
+      system_attrs: frozen.system_attrs
     })
-    this.trials.push(frozen)
+    for (const field of ['intermediate_values', 'system_attrs']) {
+      Object.defineProperty(frozen, field, {
+        configurable: true,
+        enumerable: true,
+        get() {
+          return archive.load(number)[field]
+        },
+        set(value) {
+          Object.defineProperty(frozen, field, {
+            configurable: true,
+            enumerable: true,
+            writable: true,
+            value
+          })
+        }
+      })
+    }
   }
 
-  ask() {
-    let frozen = null
-    for (let i = 0; i < this.trials.length; i += 1) {
-      if (this.trials[i].state === TrialState.WAITING) {
-        frozen = this.trials[i]
-        break
+  _applyStorageOp(op) {
+    if (op.op === 'create_study') {
+      if (
+        op.directions.length !== this.directions.length ||
+        op.directions.some((direction, i) => direction !== this.directions[i])
+      ) {
+        throw new Error(
+          `Study directions ${JSON.stringify(this.directions)} do not match stored directions ${JSON.stringify(op.directions)}.`
+        )
+      }
+      return
+    }
+    if (op.op === 'trial') {
+      const trial = deserializeTrialFromSnapshot(op.trial)
+      const existing = this.trials[trial.number]
+      const previousState = existing === undefined ? null : existing.state
+      if (existing === undefined) {
+        this.trials[trial.number] = trial
+        if (trial.state === TrialState.WAITING) {
+          this.waitingTrialNumbers.push(trial.number)
+        }
+      } else {
+        Object.assign(existing, trial)
       }
+      this.intermediateValueStore.rebuild(trial.number, trial.intermediate_values)
+      this._recordConstraintViolation(trial)
+      this._archiveTrial(this.trials[trial.number])
+      if (isFinishedState(trial.state) && trial.state !== previousState) {
+        this.trialsVersion += 1
+      }
+      return
+    }
+    if (op.op === 'param') {
+      const trial = this.trials[op.number]
+      trial.distributions[op.name] = deserializeDistributionFromSnapshot(op.distribution)
+      trial.params[op.name] = deserializeJsonValueFromSnapshot(op.value)
+      return
+    }
+    if (op.op === 'intermediate_value') {
+      const value = deserializeJsonValueFromSnapshot(op.value)
+      this.trials[op.number].intermediate_values[String(op.step)] = value
+      this.intermediateValueStore.record(op.number, op.step, value)
+      return
+    }
+    throw new Error(`Unknown study journal operation "${op.op}".`)
+  }
+
+  _syncFromStorage() {
+    let hasHeader = false
+    for (const op of this.storage.readOps()) {
+      if (op.op === 'create_study') {
+        hasHeader = true
+      }
+      this._applyStorageOp(op)
+    }
+    return hasHeader
+  }
+
+  _writeTrialToStorage(frozen) {
+    if (this.storage === null) {
+      return
+    }
+    this.storage.withLock(() => {
+      this._syncFromStorage()
+      this.storage.appendOps([{ op: 'trial', trial: serializeTrialForSnapshot(frozen) }])
+    })
+  }
+
+  _writeParamToStorage(frozen, name) {
+    if (this.storage === null) {
+      return
+    }
+    this.storage.withLock(() => {
+      this._syncFromStorage()
+      this.storage.appendOps([
+        {
+          op: 'param',
+          number: frozen.number,
+          name,
+          distribution: serializeDistributionForSnapshot(frozen.distributions[name]),
+          value: serializeJsonValueForSnapshot(frozen.params[name])
+        }
+      ])
+    })
+  }
+
+  _writeIntermediateValueToStorage(frozen, step, value) {
+    if (this.storage === null) {
+      return
     }
+    this.storage.withLock(() => {
+      this._syncFromStorage()
+      this.storage.appendOps([
+        {
+          op: 'intermediate_value',
+          number: frozen.number,
+          step,
+          value: serializeJsonValueForSnapshot(value)
+        }
+      ])
+    })
+  }
+
+  _withStorageLock(fn) {
+    if (this.storage === null) {
+      return fn()
+    }
+    return this.storage.withLock(() => {
+      this._syncFromStorage()
+      return fn()
+    })
+  }
 
-    if (frozen === null) {
-      frozen = createFrozenTrial({
+  enqueueTrial(params) {
+    if (!isPlainObject(params)) {
+      throw new Error('enqueueTrial expects params to be an object.')
+    }
+
+    this._withStorageLock(() => {
+      const frozen = createFrozenTrial({
         number: this.trials.length,
-        state: TrialState.RUNNING
+        state: TrialState.WAITING,
+        systemAttrs: {
+          [FIXED_PARAMS_KEY]: cloneJsonValue(params)
+        }
       })
       this.trials.push(frozen)
-    } else {
-      frozen.state = TrialState.RUNNING
-      frozen.params = frozen.params || {}
-      frozen.distributions = frozen.distributions || {}
-      frozen.system_attrs = frozen.system_attrs || {}
-      frozen.intermediate_values = frozen.intermediate_values || {}
-      frozen.value = frozen.value ?? null
-      frozen.values = frozen.values ?? null
+      this.waitingTrialNumbers.push(frozen.number)
+      this._writeTrialToStorage(frozen)
+    })
+  }
+
+  ask() {
+    if (typeof this.sampler.checkStudy === 'function') {
+      this.sampler.checkStudy(this)
     }
+    const frozen = this._withStorageLock(() => {
+      let claimed = this._popWaitingTrial()
+      if (claimed === null) {
+        claimed = createFrozenTrial({
+          number: this.trials.length,
+          state: TrialState.RUNNING
+        })
+        this.trials.push(claimed)
+      } else {
+        claimed.state = TrialState.RUNNING
+        claimed.params = claimed.params || {}
+        claimed.distributions = claimed.distributions || {}
+        claimed.system_attrs = claimed.system_attrs || {}
+        claimed.intermediate_values = claimed.intermediate_values || {}
+        claimed.value = claimed.value ?? null
+        claimed.values = claimed.values ?? null
+      }
+      this._writeTrialToStorage(claimed)
+      return claimed
+    })
 
     this.sampler.beforeTrial(this, frozen)
     return new TrialRuntime(this, frozen)
@@ -112,10 +323,18 @@ export class Study {
 
     frozen.state = state
     this.sampler.afterTrial(this, frozen, state, frozen.values)
+    if (isFinishedState(state)) {
+      this.trialsVersion += 1
+    }
+    this._writeTrialToStorage(frozen)
+    this._archiveTrial(frozen)
   }
 
   getTrials({ states = null, useCache = true } = {}) {
     void useCache
+    if (this.storage !== null) {
+      this._syncFromStorage()
+    }
     if (states === null) {
       return this.trials
     }
@@ -123,12 +342,15 @@ export class Study {
   }
 
   serialize() {
+    const distributionTable = createDistributionTable()
+    const trials = this.trials.map((trial) => serializeTrialForSnapshot(trial, distributionTable))
     return {
       magic: STUDY_SNAPSHOT_MAGIC,
       version: STUDY_SNAPSHOT_VERSION,
       directions: this.directions.slice(),
       sampler: serializeSamplerForSnapshot(this.sampler),
-      trials: this.trials.map((trial) => serializeTrialForSnapshot(trial))
+      distributions: distributionTable.payloads,
+      trials
     }
   }
 
@@ -145,9 +367,9 @@ export class Study {
         `Invalid study snapshot magic "${snapshot.magic}". Expected "${STUDY_SNAPSHOT_MAGIC}".`
       )
     }
-    if (snapshot.version !== STUDY_SNAPSHOT_VERSION) {
+    if (!SUPPORTED_STUDY_SNAPSHOT_VERSIONS.includes(snapshot.version)) {
       throw new Error(
-        `Unsupported study snapshot version ${snapshot.version}. Expected ${STUDY_SNAPSHOT_VERSION}.`
+        `Unsupported study snapshot version ${snapshot.version}. Expected one of ${SUPPORTED_STUDY_SNAPSHOT_VERSIONS.join(', ')}.`
       )
     }
     if (!Array.isArray(snapshot.directions) || snapshot.directions.length === 0) {
@@ -160,9 +382,20 @@ export class Study {
     const sampler = deserializeSamplerFromSnapshot(snapshot.sampler, options)
     const study = new Study({
       sampler,
-      directions: snapshot.directions.slice()
+      directions: snapshot.directions.slice(),
+      archive: options.archive ?? null
     })
-    study.trials = snapshot.trials.map((trial) => deserializeTrialFromSnapshot(trial))
+    const distributionTable =
+      snapshot.version === 1 ? null : deserializeDistributionTable(snapshot.distributions)
+    study.trials = snapshot.trials.map((trial) =>
+      deserializeTrialFromSnapshot(trial, distributionTable)
+    )
+    study._rebuildWaitingQueue()
+    for (const trial of study.trials) {
+      study.intermediateValueStore.rebuild(trial.number, trial.intermediate_values)
+      study._recordConstraintViolation(trial)
+      study._archiveTrial(trial)
+    }
     return study
   }
 
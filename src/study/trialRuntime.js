@@ -4,7 +4,8 @@ import {
   CategoricalDistribution,
   FloatDistribution,
   IntDistribution,
-  distributionContainsValue
+  distributionContainsValue,
+  internNewDistribution
 } from '../distributions/distributions.js'
 
 export class TrialRuntime {
@@ -51,6 +52,7 @@ export class TrialRuntime {
         )
       }
       this.frozen.params[name] = fixedValue
+      this.study._writeParamToStorage(this.frozen, name)
       return fixedValue
     }
 
@@ -69,25 +71,32 @@ export class TrialRuntime {
     }
 
     this.frozen.params[name] = value
+    this.study._writeParamToStorage(this.frozen, name)
     return value
   }
 
   suggestFloat(name, low, high, options = {}) {
-    const dist = new FloatDistribution(low, high, !!options.log, options.step ?? null)
+    const dist = internNewDistribution(
+      new FloatDistribution(low, high, !!options.log, options.step ?? null)
+    )
     return this._suggest(name, dist)
   }
 
   suggestInt(name, low, high, options = {}) {
-    const dist = new IntDistribution(low, high, !!options.log, options.step ?? 1)
+    const dist = internNewDistribution(
+      new IntDistribution(low, high, !!options.log, options.step ?? 1)
+    )
     return this._suggest(name, dist)
   }
 
   suggestCategorical(name, choices) {
-    const dist = new CategoricalDistribution(choices)
+    const dist = internNewDistribution(new CategoricalDistribution(choices))
     return this._suggest(name, dist)
   }
 
   report(value, step) {
     this.frozen.intermediate_values[String(step)] = value
+    this.study.intermediateValueStore.record(this.frozen.number, step, value)
+    this.study._writeIntermediateValueToStorage(this.frozen, step, value)
   }
 }
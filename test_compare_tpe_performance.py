@@ -0,0 +1,40 @@
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT = os.path.abspath(os.path.dirname(__file__))
+SCRIPT_PATH = os.path.join(ROOT, "compare_tpe_performance.py")
+HAS_OPTUNA = importlib.util.find_spec("optuna") is not None
+
+
+@unittest.skipUnless(HAS_OPTUNA, "optuna is not installed")
+class PythonWorkerSmokeTest(unittest.TestCase):
+    def run_worker(self, name: str, n_trials: int) -> dict:
+        completed = subprocess.run(
+            [sys.executable, SCRIPT_PATH, "--worker", name, "--trials", str(n_trials), "--seeds", "0"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            timeout=300,
+        )
+        self.assertEqual(completed.returncode, 0, completed.stderr)
+        return json.loads(completed.stdout.strip().splitlines()[-1])
+
+    def test_worker_times_every_trial(self) -> None:
+        for name in ["core_single_objective", "multi_objective_group", "constraints_pruning_constant_liar"]:
+            with self.subTest(scenario=name):
+                result = self.run_worker(name, 12)
+                self.assertEqual(result["implementation"], "python")
+                self.assertEqual(result["scenario"], name)
+                self.assertEqual(result["completedTrials"], 12)
+                self.assertEqual(result["ask"]["count"], 12)
+                self.assertGreater(result["ask"]["p50Ms"], 0.0)
+                self.assertGreater(result["wallMs"], 0.0)
+                self.assertGreaterEqual(result["peakRssBytes"], result["baselineRssBytes"])
+
+
+if __name__ == "__main__":
+    unittest.main()
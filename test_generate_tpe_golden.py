@@ -0,0 +1,95 @@
+import importlib.util
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+HAS_OPTUNA = importlib.util.find_spec("optuna") is not None
+
+if HAS_OPTUNA:
+    import generate_tpe_golden
+
+
+def fake_scenario(name: str, value: float) -> dict:
+    return {
+        "name": name,
+        "tellLag": 0,
+        "objectiveDirections": ["minimize"],
+        "runs": [{"seed": 0, "trials": [{"number": 0, "state": "COMPLETE", "value": value}]}],
+    }
+
+
+@unittest.skipUnless(HAS_OPTUNA, "optuna is not installed")
+class PartialRegenerationTest(unittest.TestCase):
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        fixture_dir = os.path.join(tmp.name, "golden-tpe")
+        shard_dir = os.path.join(fixture_dir, "scenarios")
+        self.paths = {
+            "FIXTURE_DIR": fixture_dir,
+            "FIXTURE_PATH": os.path.join(fixture_dir, "tpe_golden.json"),
+            "SHARD_DIR": shard_dir,
+            "SHARD_MANIFEST_PATH": os.path.join(shard_dir, "manifest.json"),
+        }
+        for name, value in self.paths.items():
+            patcher = mock.patch.object(generate_tpe_golden, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.names = [spec.name for spec in generate_tpe_golden.SCENARIOS[:4]]
+
+    def read_json(self, path: str) -> dict:
+        with open(path, "r", encoding="utf-8") as handle:
+            return json.load(handle)
+
+    def write_full(self, output_format: str) -> None:
+        scenarios = [fake_scenario(name, 1.0) for name in self.names]
+        generate_tpe_golden.write_fixture(scenarios, output_format, {})
+
+    def regenerate(self, output_format: str) -> None:
+        existing = generate_tpe_golden.load_existing_scenarios()
+        generate_tpe_golden.write_fixture([fake_scenario(self.names[1], 2.0)], output_format, existing)
+
+    def test_sharded_partial_over_legacy_fixture_keeps_every_scenario(self) -> None:
+        self.write_full("compact")
+        self.regenerate("sharded")
+
+        manifest = self.read_json(self.paths["SHARD_MANIFEST_PATH"])
+        self.assertEqual([entry["name"] for entry in manifest["scenarios"]], self.names)
+        for entry in manifest["scenarios"]:
+            shard = self.read_json(os.path.join(self.paths["SHARD_DIR"], entry["file"]))
+            expected = 2.0 if entry["name"] == self.names[1] else 1.0
+            self.assertEqual(shard["runs"][0]["trials"][0]["value"], expected)
+        self.assertFalse(os.path.exists(self.paths["FIXTURE_PATH"]))
+
+    def test_compact_partial_over_shards_keeps_every_scenario(self) -> None:
+        self.write_full("sharded")
+        self.regenerate("compact")
+
+        fixture = self.read_json(self.paths["FIXTURE_PATH"])
+        self.assertEqual([scenario["name"] for scenario in fixture["scenarios"]], self.names)
+        values = [scenario["runs"][0]["trials"][0]["value"] for scenario in fixture["scenarios"]]
+        self.assertEqual(values, [1.0, 2.0, 1.0, 1.0])
+        self.assertFalse(os.path.exists(self.paths["SHARD_MANIFEST_PATH"]))
+
+    def test_sharded_partial_rewrites_only_the_selected_shard(self) -> None:
+        self.write_full("sharded")
+        untouched = generate_tpe_golden.shard_path(self.names[0])
+        os.utime(untouched, (0, 0))
+        self.regenerate("sharded")
+
+        self.assertEqual(os.stat(untouched).st_mtime, 0)
+        manifest = self.read_json(self.paths["SHARD_MANIFEST_PATH"])
+        self.assertEqual([entry["name"] for entry in manifest["scenarios"]], self.names)
+
+    def test_partial_regeneration_without_a_fixture_is_refused(self) -> None:
+        with mock.patch.object(generate_tpe_golden, "run_scenarios") as run_scenarios:
+            with self.assertRaises(SystemExit):
+                generate_tpe_golden.main(["--scenario", self.names[0], "--no-cache"])
+        run_scenarios.assert_not_called()
+        self.assertFalse(os.path.exists(self.paths["FIXTURE_DIR"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import { describe, it, expect, beforeEach, afterEach } from 'vitest'
+import fs from 'fs'
+import os from 'os'
+import path from 'path'
+import { Study, TrialState, createTPESampler, deserializeStudy, serializeStudy } from './src/optuna_tpe.js'
+import { TrialArchive } from './src/storage/trialArchive.js'
+
+function createStudy(archive = null) {
+  return new Study({
+    sampler: createTPESampler({
+      seed: 7,
+      nStartupTrials: 4,
+      constraintsFunc: (trial) => [trial.params.x - 2]
+    }),
+    directions: ['minimize'],
+    archive
+  })
+}
+
+function runTrials(study, nTrials) {
+  const sampled = []
+  for (let i = 0; i < nTrials; i += 1) {
+    const trial = study.ask()
+    const x = trial.suggestFloat('x', -5, 5)
+    trial.report(x * x, 0)
+    trial.report(x * x / 2, 1)
+    if (i % 5 === 4) {
+      study.tell(trial, { state: TrialState.PRUNED })
+    } else {
+      study.tell(trial, { value: x * x })
+    }
+    sampled.push(x)
+  }
+  return sampled
+}
+
+describe('TrialArchive', () => {
+  let tmpDir = null
+  const archives = []
+
+  function openArchive(name) {
+    const archive = new TrialArchive(path.join(tmpDir, name))
+    archives.push(archive)
+    return archive
+  }
+
+  beforeEach(() => {
+    tmpDir = fs.mkdtempSync(path.join(os.tmpdir(), 'optuna-tpe-archive-'))
+  })
+
+  afterEach(() => {
+    for (const archive of archives.splice(0)) {
+      archive.close()
+    }
+    fs.rmSync(tmpDir, { recursive: true, force: true })
+  })
+
+  it('produces the same samples and snapshot as an in-memory study', () => {
+    const plain = createStudy()
+    const archived = createStudy(openArchive('study.archive'))
+
+    expect(runTrials(archived, 30)).toEqual(runTrials(plain, 30))
+    expect(serializeStudy(archived)).toEqual(serializeStudy(plain))
+    expect(archived.trials[3].intermediate_values).toEqual(plain.trials[3].intermediate_values)
+  })
+
+  it('returns frozen records so writes to archived fields fail loudly', () => {
+    const study = createStudy(openArchive('study.archive'))
+    runTrials(study, 3)
+    const trial = study.trials[1]
+
+    expect(Object.isFrozen(trial.system_attrs)).toBe(true)
+    expect(() => {
+      trial.system_attrs.foo = 1
+    }).toThrow(TypeError)
+    expect(() => {
+      trial.intermediate_values['2'] = 1
+    }).toThrow(TypeError)
+
+    trial.system_attrs = { replaced: true }
+    expect(trial.system_attrs).toEqual({ replaced: true })
+  })
+
+  it('reads each archived record once per serialize', () => {
+    const archive = openArchive('study.archive')
+    const study = createStudy(archive)
+    runTrials(study, 12)
+
+    const originalRead = archive._readRecord
+    let reads = 0
+    archive._readRecord = function countingRead(number) {
+      reads += 1
+      return originalRead.call(this, number)
+    }
+    serializeStudy(study)
+    expect(reads).toBe(12)
+  })
+
+  it('rehydrates a snapshot into an archive and continues identically', () => {
+    const source = createStudy()
+    runTrials(source, 20)
+    const snapshot = JSON.parse(JSON.stringify(serializeStudy(source)))
+
+    const options = { samplerFunctions: { constraintsFunc: (trial) => [trial.params.x - 2] } }
+    const plain = deserializeStudy(snapshot, options)
+    const archive = openArchive('restored.archive')
+    const archived = deserializeStudy(snapshot, { ...options, archive })
+
+    for (const trial of archived.trials) {
+      expect(archive.has(trial.number)).toBe(true)
+    }
+    expect(serializeStudy(archived)).toEqual(snapshot)
+    expect(runTrials(archived, 10)).toEqual(runTrials(plain, 10))
+  })
+})
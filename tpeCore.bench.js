@@ -0,0 +1,114 @@
+import { performance } from 'perf_hooks'
+import { Study } from './src/optuna_tpe.js'
+import { TPESampler } from './src/sampler/tpeSampler.js'
+import { runGoldenScenario } from './tpeCore.golden.runner.js'
+
+function parseArgs(argv) {
+  const args = {}
+  for (let i = 0; i < argv.length; i += 2) {
+    const key = argv[i]
+    if (!key.startsWith('--') || i + 1 >= argv.length) {
+      throw new Error(`Invalid argument: ${key}`)
+    }
+    args[key.slice(2)] = argv[i + 1]
+  }
+  if (typeof args.scenario !== 'string') {
+    throw new Error('--scenario is required.')
+  }
+  return {
+    name: args.scenario,
+    nTrials: Number(args.trials ?? 100),
+    seed: Number(args.seed ?? 0),
+    tellLag: Number(args['tell-lag'] ?? 0)
+  }
+}
+
+export function summarizeLatencies(samples) {
+  if (samples.length === 0) {
+    return { count: 0, meanMs: null, p50Ms: null, p95Ms: null, maxMs: null, totalMs: 0 }
+  }
+  const sorted = Float64Array.from(samples).sort()
+  let total = 0
+  for (let i = 0; i < sorted.length; i += 1) {
+    total += sorted[i]
+  }
+  const pick = (q) => sorted[Math.min(sorted.length - 1, Math.floor(q * sorted.length))]
+  return {
+    count: sorted.length,
+    meanMs: total / sorted.length,
+    p50Ms: pick(0.5),
+    p95Ms: pick(0.95),
+    maxMs: sorted[sorted.length - 1],
+    totalMs: total
+  }
+}
+
+const TIMED_SAMPLER_METHODS = ['inferRelativeSearchSpace', 'sampleRelative', 'sampleIndependent']
+
+function instrumentTrialLatency(latencies) {
+  let depth = 0
+  const timed = (fn, trialNumberOf) =>
+    function timedCall(...args) {
+      if (depth > 0) {
+        return fn.apply(this, args)
+      }
+      depth += 1
+      const start = performance.now()
+      let result
+      try {
+        result = fn.apply(this, args)
+      } finally {
+        depth -= 1
+      }
+      const trialNumber = trialNumberOf(args, result)
+      latencies.set(trialNumber, (latencies.get(trialNumber) ?? 0) + performance.now() - start)
+      return result
+    }
+
+  const originals = [[Study.prototype, 'ask', Study.prototype.ask]]
+  Study.prototype.ask = timed(Study.prototype.ask, (_args, trial) => trial.number)
+  for (const method of TIMED_SAMPLER_METHODS) {
+    originals.push([TPESampler.prototype, method, TPESampler.prototype[method]])
+    TPESampler.prototype[method] = timed(TPESampler.prototype[method], (args) => args[1].number)
+  }
+  return () => {
+    for (const [target, method, original] of originals) {
+      target[method] = original
+    }
+  }
+}
+
+export async function benchGoldenScenario({ name, nTrials, seed, tellLag }) {
+  const askLatencies = new Map()
+  const restore = instrumentTrialLatency(askLatencies)
+
+  const baselineRssBytes = process.resourceUsage().maxRSS * 1024
+  const start = performance.now()
+  let trials
+  try {
+    trials = await runGoldenScenario({ name, seed, nTrials, tellLag })
+  } finally {
+    restore()
+  }
+  const wallMs = performance.now() - start
+
+  return {
+    implementation: 'js',
+    runtime: `node ${process.versions.node}`,
+    scenario: name,
+    nTrials,
+    seed,
+    tellLag,
+    completedTrials: trials.length,
+    wallMs,
+    ask: summarizeLatencies([...askLatencies.values()]),
+    baselineRssBytes,
+    peakRssBytes: process.resourceUsage().maxRSS * 1024
+  }
+}
+
+const isMain = process.argv[1] && import.meta.url === new URL(`file://${process.argv[1]}`).href
+if (isMain) {
+  const result = await benchGoldenScenario(parseArgs(process.argv.slice(2)))
+  process.stdout.write(`${JSON.stringify(result)}\n`)
+}
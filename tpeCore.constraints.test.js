@@ -0,0 +1,47 @@
+import { describe, it, expect } from 'vitest'
+import { Study, createTPESampler } from './src/optuna_tpe.js'
+import { ConstraintViolationStore } from './src/study/constraintViolationStore.js'
+
+describe('ConstraintViolationStore', () => {
+  it('distinguishes missing constraints from an infinite violation', () => {
+    const store = new ConstraintViolationStore(2)
+    store.record(0, null)
+    store.record(1, [Infinity, -1])
+    store.record(5, [-1, 0])
+
+    expect(store.has(0)).toBe(true)
+    expect(store.hasConstraints(0)).toBe(false)
+    expect(store.violation(0)).toBe(Infinity)
+
+    expect(store.hasConstraints(1)).toBe(true)
+    expect(store.isFeasible(1)).toBe(false)
+    expect(store.violation(1)).toBe(Infinity)
+
+    expect(store.isFeasible(5)).toBe(true)
+    expect(store.violation(5)).toBe(0)
+    expect(store.has(3)).toBe(false)
+    expect(store.has(64)).toBe(false)
+  })
+
+  it('does not re-evaluate constraints of infinitely violating trials', () => {
+    let calls = 0
+    const study = new Study({
+      sampler: createTPESampler({
+        seed: 1,
+        nStartupTrials: 4,
+        constraintsFunc: () => {
+          calls += 1
+          return [Infinity]
+        }
+      }),
+      directions: ['minimize', 'minimize']
+    })
+    const nTrials = 20
+    for (let i = 0; i < nTrials; i += 1) {
+      const trial = study.ask()
+      const x = trial.suggestFloat('x', -5, 5)
+      study.tell(trial, { values: [x * x, (x - 1) ** 2] })
+    }
+    expect(calls).toBe(nTrials)
+  })
+})
@@ -0,0 +1,108 @@
+import { describe, it, expect } from 'vitest'
+import { spawn } from 'child_process'
+import path from 'path'
+import { fileURLToPath, pathToFileURL } from 'url'
+
+const __dirname = path.dirname(fileURLToPath(import.meta.url))
+const STUDY_URL = pathToFileURL(path.join(__dirname, 'src', 'entries', 'study.js')).href
+const SAMPLER_URL = pathToFileURL(path.join(__dirname, 'src', 'entries', 'sampler.js')).href
+
+const FAILING_LOADER = `
+export async function resolve(specifier, context, next) {
+  if (specifier.endsWith('multiObjective/splitTrials.js')) {
+    throw new Error('simulated load failure')
+  }
+  return next(specifier, context)
+}
+`
+
+function studyScript(body, { failLoad = false } = {}) {
+  const register = failLoad
+    ? `import { register } from 'module'
+register(${JSON.stringify(`data:text/javascript,${encodeURIComponent(FAILING_LOADER)}`)})
+`
+    : ''
+  return `${register}
+const { Study } = await import(${JSON.stringify(STUDY_URL)})
+const { createTPESampler } = await import(${JSON.stringify(SAMPLER_URL)})
+const study = new Study({
+  sampler: createTPESampler({ seed: 0, nStartupTrials: 2 }),
+  directions: ['minimize', 'minimize']
+})
+const result = {}
+${body}
+process.stdout.write(JSON.stringify(result))
+`
+}
+
+function runScript(script) {
+  return new Promise((resolve, reject) => {
+    const child = spawn(process.execPath, ['--input-type=module', '-e', script], {
+      stdio: ['ignore', 'pipe', 'pipe']
+    })
+    let stdout = ''
+    let stderr = ''
+    child.stdout.on('data', (chunk) => {
+      stdout += chunk
+    })
+    child.stderr.on('data', (chunk) => {
+      stderr += chunk
+    })
+    child.on('error', reject)
+    child.on('close', (code) => {
+      resolve({ code, stderr, result: stdout === '' ? null : JSON.parse(stdout) })
+    })
+  })
+}
+
+const ASK_ONCE = `
+try {
+  study.ask()
+  result.asked = true
+} catch (err) {
+  result.error = err.message
+}
+result.trials = study.trials.length
+`
+
+describe('subpath entries', () => {
+  it('refuses to ask before multi-objective support is loaded', async () => {
+    const { code, result } = await runScript(studyScript(ASK_ONCE))
+    expect(code).toBe(0)
+    expect(result.error).toMatch('await study.ready')
+    expect(result.trials).toBe(0)
+  })
+
+  it('samples multi-objective studies after ready resolves', async () => {
+    const { code, result } = await runScript(
+      studyScript(`
+await study.ready
+for (let i = 0; i < 6; i += 1) {
+  const trial = study.ask()
+  const x = trial.suggestFloat('x', -1, 1)
+  study.tell(trial, { values: [x * x, (x - 1) ** 2] })
+}
+result.trials = study.trials.length
+`)
+    )
+    expect(code).toBe(0)
+    expect(result.trials).toBe(6)
+  })
+
+  it('surfaces a failed support import without an unhandled rejection', async () => {
+    const { code, stderr, result } = await runScript(
+      studyScript(
+        `
+await new Promise((resolve) => setTimeout(resolve, 50))
+${ASK_ONCE}
+result.ready = await study.ready.then(() => 'resolved', (err) => err.message)
+`,
+        { failLoad: true }
+      )
+    )
+    expect(code, stderr).toBe(0)
+    expect(result.error).toMatch('failed to load: simulated load failure')
+    expect(result.trials).toBe(0)
+    expect(result.ready).toMatch('simulated load failure')
+  })
+})
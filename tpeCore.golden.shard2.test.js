@@ -0,0 +1,3 @@
+import { defineGoldenParitySuite } from './tpeCore.golden.suite.js'
+
+defineGoldenParitySuite(1)
@@ -0,0 +1,222 @@
+import { describe, it, expect, beforeAll, afterAll } from 'vitest'
+import fs from 'fs'
+import path from 'path'
+import { fileURLToPath } from 'url'
+import { runGoldenScenario } from './tpeCore.golden.runner.js'
+
+const __filename = fileURLToPath(import.meta.url)
+const __dirname = path.dirname(__filename)
+const FIXTURE_DIR = path.join(__dirname, 'fixtures', 'golden-tpe')
+const FIXTURE_PATH = path.join(FIXTURE_DIR, 'tpe_golden.json')
+const SHARD_DIR = path.join(FIXTURE_DIR, 'scenarios')
+const SHARD_MANIFEST_PATH = path.join(SHARD_DIR, 'manifest.json')
+const ABS_EPSILON = 1e-12
+const REL_EPSILON = 1e-9
+
+export const GOLDEN_SHARD_COUNT = 4
+
+const EMPTY_OBJECT = Object.freeze({})
+const EMPTY_ARRAY = Object.freeze([])
+const TRIAL_FIELDS = [
+  ['number', undefined],
+  ['params', EMPTY_OBJECT],
+  ['state', undefined],
+  ['value', null],
+  ['values', null],
+  ['intermediate_values', EMPTY_ARRAY],
+  ['constraint', null]
+]
+
+let legacyFixture = null
+
+function readJson(filePath) {
+  return JSON.parse(fs.readFileSync(filePath, 'utf8'))
+}
+
+function loadLegacyFixture() {
+  if (legacyFixture === null) {
+    legacyFixture = readJson(FIXTURE_PATH)
+  }
+  return legacyFixture
+}
+
+export function loadGoldenManifest() {
+  if (fs.existsSync(SHARD_MANIFEST_PATH)) {
+    return readJson(SHARD_MANIFEST_PATH).scenarios
+  }
+  return loadLegacyFixture().scenarios.map((scenario) => ({
+    name: scenario.name,
+    file: null,
+    seeds: scenario.runs.map((run) => run.seed),
+    trials: scenario.runs.reduce((total, run) => total + run.trials.length, 0)
+  }))
+}
+
+export function loadGoldenScenario(entry) {
+  if (entry.file === null) {
+    return loadLegacyFixture().scenarios.find((scenario) => scenario.name === entry.name)
+  }
+  return readJson(path.join(SHARD_DIR, entry.file))
+}
+
+export function assignGoldenShards(entries, shardCount) {
+  const loads = new Float64Array(shardCount)
+  const assignment = new Map()
+  const order = entries
+    .map((entry, index) => ({ entry, index }))
+    .sort((a, b) => b.entry.trials - a.entry.trials || a.index - b.index)
+  for (const { entry } of order) {
+    let target = 0
+    for (let shard = 1; shard < shardCount; shard += 1) {
+      if (loads[shard] < loads[target]) {
+        target = shard
+      }
+    }
+    loads[target] += entry.trials
+    assignment.set(entry.name, target)
+  }
+  return assignment
+}
+
+function numberMismatch(actual, expected) {
+  if (typeof actual !== 'number') {
+    return `: expected number ${expected}, actual=${actual}`
+  }
+  const diff = Math.abs(actual - expected)
+  const tolerance = Math.max(ABS_EPSILON, Math.abs(expected) * REL_EPSILON)
+  if (diff <= tolerance) {
+    return null
+  }
+  return `: expected=${expected}, actual=${actual}, diff=${diff}, tolerance=${tolerance}`
+}
+
+function arrayMismatch(actual, expected) {
+  if (!Array.isArray(actual)) {
+    return ': expected array'
+  }
+  if (actual.length !== expected.length) {
+    return `: array length expected=${expected.length}, actual=${actual.length}`
+  }
+  for (let i = 0; i < expected.length; i += 1) {
+    const expectedItem = expected[i]
+    const actualItem = actual[i]
+    if (typeof expectedItem === 'number' && typeof actualItem === 'number') {
+      const diff = Math.abs(actualItem - expectedItem)
+      if (diff <= ABS_EPSILON || diff <= Math.abs(expectedItem) * REL_EPSILON) {
+        continue
+      }
+    }
+    const mismatch = valueMismatch(actualItem, expectedItem)
+    if (mismatch !== null) {
+      return `[${i}]${mismatch}`
+    }
+  }
+  return null
+}
+
+function objectMismatch(actual, expected) {
+  if (typeof actual !== 'object' || actual === null) {
+    return ': expected object'
+  }
+  let expectedKeyCount = 0
+  for (const key in expected) {
+    if (!Object.prototype.hasOwnProperty.call(expected, key)) {
+      continue
+    }
+    expectedKeyCount += 1
+    if (!Object.prototype.hasOwnProperty.call(actual, key)) {
+      return `: object keys missing "${key}"`
+    }
+    const mismatch = valueMismatch(actual[key], expected[key])
+    if (mismatch !== null) {
+      return `.${key}${mismatch}`
+    }
+  }
+  let actualKeyCount = 0
+  for (const key in actual) {
+    if (Object.prototype.hasOwnProperty.call(actual, key)) {
+      actualKeyCount += 1
+    }
+  }
+  if (actualKeyCount !== expectedKeyCount) {
+    return `: object keys expected ${expectedKeyCount}, actual ${actualKeyCount}`
+  }
+  return null
+}
+
+export function valueMismatch(actual, expected) {
+  if (expected === null) {
+    return actual === null ? null : `: expected null, actual=${actual}`
+  }
+  if (typeof expected === 'number') {
+    return numberMismatch(actual, expected)
+  }
+  if (Array.isArray(expected)) {
+    return arrayMismatch(actual, expected)
+  }
+  if (typeof expected === 'object') {
+    return objectMismatch(actual, expected)
+  }
+  return Object.is(actual, expected) ? null : `: expected=${expected}, actual=${actual}`
+}
+
+export function trialMismatch(actualTrial, expectedTrial) {
+  for (const [field, fallback] of TRIAL_FIELDS) {
+    const mismatch = valueMismatch(
+      actualTrial[field] ?? fallback,
+      expectedTrial[field] ?? fallback
+    )
+    if (mismatch !== null) {
+      return `.${field}${mismatch}`
+    }
+  }
+  return null
+}
+
+export function defineGoldenParitySuite(shardIndex, shardCount = GOLDEN_SHARD_COUNT) {
+  const entries = loadGoldenManifest()
+  const assignment = assignGoldenShards(entries, shardCount)
+
+  describe(`TPE parity against Optuna golden fixture (shard ${shardIndex + 1}/${shardCount})`, () => {
+    for (const entry of entries) {
+      if (assignment.get(entry.name) !== shardIndex) {
+        continue
+      }
+
+      describe(`scenario: ${entry.name}`, () => {
+        let scenario = null
+
+        beforeAll(() => {
+          scenario = loadGoldenScenario(entry)
+        })
+
+        afterAll(() => {
+          scenario = null
+        })
+
+        entry.seeds.forEach((seed, runIndex) => {
+          it(`matches seed=${seed}`, async () => {
+            const run = scenario.runs[runIndex]
+            const actualTrials = await runGoldenScenario({
+              name: scenario.name,
+              seed: run.seed,
+              nTrials: run.trials.length,
+              tellLag: scenario.tellLag,
+              objectiveDirections: scenario.objectiveDirections
+            })
+
+            expect(Array.isArray(actualTrials)).toBe(true)
+            expect(actualTrials.length).toBe(run.trials.length)
+
+            for (let idx = 0; idx < run.trials.length; idx += 1) {
+              const mismatch = trialMismatch(actualTrials[idx], run.trials[idx])
+              if (mismatch !== null) {
+                expect.fail(`${scenario.name}/seed=${run.seed}/trial=${idx}${mismatch}`)
+              }
+            }
+          })
+        })
+      })
+    }
+  })
+}
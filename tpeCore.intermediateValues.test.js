@@ -0,0 +1,72 @@
+import { describe, it, expect } from 'vitest'
+import { IntermediateValueStore } from './src/study/intermediateValueStore.js'
+import { getPrunedTrialScore } from './src/sampler/splitTrials.js'
+
+describe('IntermediateValueStore', () => {
+  it('keeps the value of the highest step when steps arrive out of order', () => {
+    const store = new IntermediateValueStore()
+    store.record(0, 3, 0.3)
+    store.record(0, 1, 0.1)
+    store.record(0, 2, 0.2)
+
+    expect(store.lastStep(0)).toBe(3)
+    expect(store.lastValue(0)).toBe(0.3)
+  })
+
+  it('overwrites a re-reported step with the latest value', () => {
+    const store = new IntermediateValueStore()
+    store.record(0, 5, 0.5)
+    store.record(0, 5, 0.25)
+    store.record(0, '5', 0.125)
+
+    expect(store.lastStep(0)).toBe(5)
+    expect(store.lastValue(0)).toBe(0.125)
+  })
+
+  it('tracks trials independently and grows past its initial capacity', () => {
+    const store = new IntermediateValueStore(2)
+    store.record(0, 1, 1)
+    store.record(9, 4, 9)
+
+    expect(store.has(0)).toBe(true)
+    expect(store.has(1)).toBe(false)
+    expect(store.has(9)).toBe(true)
+    expect(store.has(100)).toBe(false)
+    expect(store.lastStep(9)).toBe(4)
+    expect(store.lastValue(0)).toBe(1)
+  })
+
+  it('ignores non-numeric steps', () => {
+    const store = new IntermediateValueStore()
+    store.record(0, 'bad', 1)
+    expect(store.has(0)).toBe(false)
+  })
+
+  it('rebuild replaces earlier records with the given intermediate values', () => {
+    const store = new IntermediateValueStore()
+    store.record(0, 10, 1)
+    store.rebuild(0, { 2: 0.2, 7: 0.7, 4: 0.4 })
+    expect(store.lastStep(0)).toBe(7)
+    expect(store.lastValue(0)).toBe(0.7)
+
+    store.rebuild(0, {})
+    expect(store.has(0)).toBe(false)
+  })
+
+  it('gives the same pruned score as scanning the trial', () => {
+    const intermediateValues = { 4: 0.4, 12: Number.NaN, 9: 0.9 }
+    const trial = { number: 3, intermediate_values: intermediateValues }
+    const store = new IntermediateValueStore()
+    store.rebuild(3, intermediateValues)
+
+    for (const direction of ['minimize', 'maximize']) {
+      const scanned = getPrunedTrialScore(trial, { direction })
+      const stored = getPrunedTrialScore(trial, { direction, intermediateValueStore: store })
+      expect(stored).toEqual(scanned)
+    }
+    expect(getPrunedTrialScore(trial, { direction: 'minimize', intermediateValueStore: store })).toEqual([
+      -12,
+      Infinity
+    ])
+  })
+})
@@ -0,0 +1,199 @@
+import { describe, it, expect, beforeEach, afterEach } from 'vitest'
+import { spawn } from 'child_process'
+import fs from 'fs'
+import os from 'os'
+import path from 'path'
+import { fileURLToPath, pathToFileURL } from 'url'
+import { Study, TrialState, createTPESampler } from './src/optuna_tpe.js'
+import { JournalFileStorage } from './src/storage/journalFileStorage.js'
+
+const __dirname = path.dirname(fileURLToPath(import.meta.url))
+const ENTRY_URL = pathToFileURL(path.join(__dirname, 'src', 'optuna_tpe.js')).href
+const STORAGE_URL = pathToFileURL(path.join(__dirname, 'src', 'storage', 'journalFileStorage.js')).href
+const WORKER_COUNT = 4
+const TRIALS_PER_WORKER = 25
+const ENQUEUED_X = [0.125, 0.25, 0.375, 0.5, 0.625, 0.75]
+
+const WORKER_SCRIPT = `
+import { Study, createTPESampler } from ${JSON.stringify(ENTRY_URL)}
+import { JournalFileStorage } from ${JSON.stringify(STORAGE_URL)}
+
+const [journalPath, seed, nTrials] = process.argv.slice(1)
+const storage = new JournalFileStorage(journalPath, { retryIntervalMs: 1 })
+const study = new Study({
+  sampler: createTPESampler({ seed: Number(seed), nStartupTrials: 5 }),
+  directions: ['minimize'],
+  storage
+})
+const claimed = []
+for (let i = 0; i < Number(nTrials); i += 1) {
+  const trial = study.ask()
+  const x = trial.suggestFloat('x', 0, 1)
+  study.tell(trial, { value: (x - 0.3) ** 2 })
+  claimed.push({ number: trial.number, x })
+}
+process.stdout.write(JSON.stringify(claimed))
+`
+
+function runWorker(journalPath, seed) {
+  return new Promise((resolve, reject) => {
+    const child = spawn(
+      process.execPath,
+      ['--input-type=module', '-e', WORKER_SCRIPT, journalPath, String(seed), String(TRIALS_PER_WORKER)],
+      { stdio: ['ignore', 'pipe', 'pipe'] }
+    )
+    let stdout = ''
+    let stderr = ''
+    child.stdout.on('data', (chunk) => {
+      stdout += chunk
+    })
+    child.stderr.on('data', (chunk) => {
+      stderr += chunk
+    })
+    child.on('error', reject)
+    child.on('close', (code) => {
+      if (code !== 0) {
+        reject(new Error(`worker ${seed} exited with ${code}: ${stderr}`))
+        return
+      }
+      resolve(JSON.parse(stdout))
+    })
+  })
+}
+
+describe('JournalFileStorage', () => {
+  let tmpDir = null
+  let journalPath = null
+
+  beforeEach(() => {
+    tmpDir = fs.mkdtempSync(path.join(os.tmpdir(), 'optuna-tpe-journal-'))
+    journalPath = path.join(tmpDir, 'study.journal')
+  })
+
+  afterEach(() => {
+    fs.rmSync(tmpDir, { recursive: true, force: true })
+  })
+
+  it('allocates unique trial numbers and claims each waiting trial once across processes', async () => {
+    const study = new Study({
+      sampler: createTPESampler({ seed: 0 }),
+      directions: ['minimize'],
+      storage: new JournalFileStorage(journalPath)
+    })
+    for (const x of ENQUEUED_X) {
+      study.enqueueTrial({ x })
+    }
+
+    const results = await Promise.all(
+      Array.from({ length: WORKER_COUNT }, (_, seed) => runWorker(journalPath, seed + 1))
+    )
+    const claimed = results.flat()
+    const total = WORKER_COUNT * TRIALS_PER_WORKER
+
+    const numbers = claimed.map((entry) => entry.number).sort((a, b) => a - b)
+    expect(numbers).toEqual(Array.from({ length: total }, (_, i) => i))
+
+    for (const x of ENQUEUED_X) {
+      expect(claimed.filter((entry) => entry.x === x).length, `enqueued x=${x}`).toBe(1)
+    }
+
+    const trials = study.getTrials()
+    expect(trials.length).toBe(total)
+    expect(trials.every((trial) => trial.state === TrialState.COMPLETE)).toBe(true)
+    for (const entry of claimed) {
+      expect(trials[entry.number].params.x).toBe(entry.x)
+    }
+    expect(fs.existsSync(`${journalPath}.lock`)).toBe(false)
+  }, 60000)
+
+  it('appends one small op per parameter and bumps trialsVersion only when a trial finishes', () => {
+    const createStudy = () =>
+      new Study({
+        sampler: createTPESampler({ seed: 0 }),
+        directions: ['minimize'],
+        storage: new JournalFileStorage(journalPath)
+      })
+    const writer = createStudy()
+    const reader = createStudy()
+    const trial = writer.ask()
+    const readLines = () => fs.readFileSync(journalPath, 'utf8').split('\n').filter((line) => line.length > 0)
+    const linesBefore = readLines().length
+
+    for (let i = 0; i < 20; i += 1) {
+      trial.suggestFloat(`x${i}`, 0, 1)
+    }
+    const paramLines = readLines().slice(linesBefore)
+    expect(paramLines.length).toBe(20)
+    for (const line of paramLines) {
+      expect(line.length).toBeLessThan(200)
+    }
+
+    reader.getTrials()
+    const version = reader.trialsVersion
+    trial.report(0.5, 0)
+    reader.getTrials()
+    expect(reader.trialsVersion).toBe(version)
+    expect(reader.trials[0].params).toEqual(trial.frozen.params)
+    expect(reader.trials[0].distributions.x3).toBe(trial.frozen.distributions.x3)
+    expect(reader.trials[0].intermediate_values).toEqual({ 0: 0.5 })
+
+    writer.tell(trial, { value: 1 })
+    reader.getTrials()
+    expect(reader.trialsVersion).toBe(version + 1)
+    expect(reader.trials[0].state).toBe(TrialState.COMPLETE)
+  })
+
+  it('drops the unterminated tail left by a writer that crashed mid-append', () => {
+    const options = {
+      sampler: createTPESampler({ seed: 0, nStartupTrials: 2 }),
+      directions: ['minimize']
+    }
+    const first = new Study({ ...options, storage: new JournalFileStorage(journalPath) })
+    for (let i = 0; i < 3; i += 1) {
+      const trial = first.ask()
+      const x = trial.suggestFloat('x', 0, 1)
+      first.tell(trial, { value: x })
+    }
+    const intactSize = fs.statSync(journalPath).size
+    fs.appendFileSync(journalPath, '{"op":"set_trial","trial":{"number":3,"sta')
+
+    const second = new Study({ ...options, storage: new JournalFileStorage(journalPath) })
+    expect(second.getTrials().length).toBe(3)
+    const trial = second.ask()
+    const x = trial.suggestFloat('x', 0, 1)
+    second.tell(trial, { value: x })
+
+    const lines = fs.readFileSync(journalPath, 'utf8').split('\n')
+    expect(lines.pop()).toBe('')
+    for (const line of lines) {
+      expect(() => JSON.parse(line)).not.toThrow()
+    }
+    expect(fs.statSync(journalPath).size).toBeGreaterThan(intactSize)
+    expect(first.getTrials().map((t) => t.state)).toEqual([
+      TrialState.COMPLETE,
+      TrialState.COMPLETE,
+      TrialState.COMPLETE,
+      TrialState.COMPLETE
+    ])
+  })
+
+  it('does not remove a lock that was taken over as stale', () => {
+    const first = new JournalFileStorage(journalPath, { staleLockMs: 20 })
+    const second = new JournalFileStorage(journalPath, { staleLockMs: 20 })
+
+    first.withLock(() => {
+      const past = new Date(Date.now() - 1000)
+      fs.utimesSync(`${journalPath}.lock`, past, past)
+      second.withLock(() => {
+        expect(fs.readFileSync(`${journalPath}.lock`, 'utf8')).toBe(second.lockToken)
+      })
+      first.readOps()
+      expect(() => first.appendOps([{ op: 'noop' }])).toThrow('no longer held')
+      second.withLock(() => {
+        first._releaseLock()
+        expect(fs.existsSync(`${journalPath}.lock`)).toBe(true)
+      })
+    })
+    expect(fs.existsSync(`${journalPath}.lock`)).toBe(false)
+  })
+})
@@ -0,0 +1,117 @@
+import { describe, it, expect } from 'vitest'
+import { argSelectSmallest } from './src/math/sorting.js'
+import {
+  splitCompleteTrialsSingleObjective,
+  splitInfeasibleTrials,
+  splitPrunedTrials
+} from './src/sampler/splitTrials.js'
+import { CONSTRAINTS_KEY } from './src/core/constants.js'
+
+function createRandom(seed) {
+  let state = seed >>> 0
+  return () => {
+    state = (Math.imul(state, 1664525) + 1013904223) >>> 0
+    return state / 2 ** 32
+  }
+}
+
+function stableOrder(keys) {
+  return Array.from({ length: keys.length }, (_, i) => i).sort((a, b) => keys[a] - keys[b] || a - b)
+}
+
+function selectByKey(keys, k) {
+  return Array.from(argSelectSmallest(keys.length, k, (i, j) => keys[i] - keys[j]))
+}
+
+function numbers(trials) {
+  return trials.map((trial) => trial.number)
+}
+
+describe('argSelectSmallest', () => {
+  it('breaks ties by index and returns the selection in order', () => {
+    const keys = [3, 1, 1, 2, 1, 0]
+    expect(selectByKey(keys, 1)).toEqual([5])
+    expect(selectByKey(keys, 3)).toEqual([5, 1, 2])
+    expect(selectByKey(keys, 4)).toEqual([5, 1, 2, 4])
+    expect(selectByKey([7, 7, 7, 7], 2)).toEqual([0, 1])
+  })
+
+  it('returns the full stable order when k >= n', () => {
+    const keys = [2, 0, 2, 1, 0]
+    expect(selectByKey(keys, keys.length)).toEqual([1, 4, 3, 0, 2])
+    expect(selectByKey(keys, 10)).toEqual([1, 4, 3, 0, 2])
+  })
+
+  it('returns nothing when k <= 0 or n = 0', () => {
+    expect(selectByKey([1, 2, 3], 0)).toEqual([])
+    expect(selectByKey([1, 2, 3], -2)).toEqual([])
+    expect(selectByKey([], 3)).toEqual([])
+  })
+
+  it('matches the prefix of a stable sort', () => {
+    const random = createRandom(12345)
+    for (let iteration = 0; iteration < 500; iteration += 1) {
+      const n = Math.floor(random() * 40)
+      const k = Math.floor(random() * (n + 3))
+      const keys = Array.from({ length: n }, () => Math.floor(random() * 6))
+      expect(selectByKey(keys, k), `keys=${keys} k=${k}`).toEqual(stableOrder(keys).slice(0, k))
+    }
+  })
+})
+
+describe('split fallbacks', () => {
+  const minimizeStudy = { direction: 'minimize', directions: ['minimize'] }
+
+  it('sorts complete trials with NaN values through the comparator fallback', () => {
+    const values = [0.5, Number.NaN, 0.1, 0.3, Number.NaN, 0.2]
+    const trials = values.map((value, number) => ({ number, value }))
+    const reference = [...trials].sort((a, b) => a.value - b.value)
+
+    const [below, above] = splitCompleteTrialsSingleObjective(trials, minimizeStudy, 3)
+    expect(numbers(below)).toEqual(numbers(reference.slice(0, 3)))
+    expect(numbers(above)).toEqual(numbers(reference.slice(3)))
+  })
+
+  it('selects the same complete trials as a stable sort without NaN', () => {
+    const trials = [0.4, 0.1, 0.4, 0.2, 0.1].map((value, number) => ({ number, value }))
+    const maximizeStudy = { direction: 'maximize', directions: ['maximize'] }
+
+    expect(numbers(splitCompleteTrialsSingleObjective(trials, minimizeStudy, 3)[0])).toEqual([1, 4, 3])
+    expect(numbers(splitCompleteTrialsSingleObjective(trials, maximizeStudy, 2)[0])).toEqual([0, 2])
+  })
+
+  it('ranks pruned trials by last step, then value, with NaN values last', () => {
+    const trials = [
+      { number: 0, intermediate_values: { 0: 0.1, 1: 0.9 } },
+      { number: 1, intermediate_values: { 0: 0.2, 2: Number.NaN } },
+      { number: 2, intermediate_values: { 2: 0.5 } },
+      { number: 3, intermediate_values: {} },
+      { number: 4, intermediate_values: { 1: 0.3 } }
+    ]
+    const [below, above] = splitPrunedTrials(trials, minimizeStudy, 3)
+    expect(numbers(below)).toEqual([2, 1, 4])
+    expect(numbers(above)).toEqual([0, 3])
+  })
+
+  it('sorts pruned trials with non-numeric steps through the comparator fallback', () => {
+    const trials = [
+      { number: 0, intermediate_values: { 1: 0.4 } },
+      { number: 1, intermediate_values: { bad: 0.1 } },
+      { number: 2, intermediate_values: { 3: 0.2 } }
+    ]
+    const [below, above] = splitPrunedTrials(trials, minimizeStudy, 2)
+    expect(below.length).toBe(2)
+    expect(numbers([...below, ...above]).sort()).toEqual([0, 1, 2])
+  })
+
+  it('orders infeasible trials by violation and keeps ties in trial order', () => {
+    const violations = [[2], [0.5, 0.5], null, [0.5], [-1, 1]]
+    const trials = violations.map((constraints, number) => ({
+      number,
+      system_attrs: constraints === null ? {} : { [CONSTRAINTS_KEY]: constraints }
+    }))
+    const [below, above] = splitInfeasibleTrials(trials, 3)
+    expect(numbers(below)).toEqual([3, 1, 4])
+    expect(numbers(above)).toEqual([0, 2])
+  })
+})
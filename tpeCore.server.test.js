@@ -0,0 +1,182 @@
+import { describe, it, expect, beforeEach, afterEach } from 'vitest'
+import fs from 'fs'
+import os from 'os'
+import path from 'path'
+import {
+  CategoricalDistribution,
+  FloatDistribution,
+  Study,
+  TrialState,
+  createTPESampler
+} from './src/optuna_tpe.js'
+import { StudyClient, StudyServer, createStudyServer } from './src/server/studyServer.js'
+
+function createTestStudy() {
+  return new Study({
+    sampler: createTPESampler({ seed: 0, nStartupTrials: 2 }),
+    directions: ['minimize']
+  })
+}
+
+function trialStates(snapshot) {
+  return snapshot.trials.map((trial) => trial.state)
+}
+
+describe('StudyServer', () => {
+  let tmpDir = null
+  let socketPath = null
+  let server = null
+  const clients = []
+
+  beforeEach(() => {
+    tmpDir = fs.mkdtempSync(path.join(os.tmpdir(), 'optuna-tpe-server-'))
+    socketPath = path.join(tmpDir, 'study.sock')
+  })
+
+  afterEach(async () => {
+    for (const client of clients.splice(0)) {
+      client.close()
+    }
+    if (server !== null) {
+      await server.close()
+      server = null
+    }
+    fs.rmSync(tmpDir, { recursive: true, force: true })
+  })
+
+  async function startServer(options) {
+    server = options instanceof StudyServer ? options : new StudyServer(options)
+    await server.listen(socketPath)
+    const client = new StudyClient(socketPath)
+    clients.push(client)
+    return client
+  }
+
+  it('builds the Parzen estimators once for all asks in a batch', async () => {
+    const client = await startServer({ study: createTestStudy(), batchWindowMs: 50 })
+    const space = { x: new FloatDistribution(-5, 5) }
+    for (let i = 0; i < 2; i += 1) {
+      const { number, params } = await client.ask(space)
+      await client.tell(number, { value: params.x ** 2 })
+    }
+
+    const sampler = server.study.sampler
+    const originalSet = sampler._setCachedParzenEstimators
+    let builds = 0
+    sampler._setCachedParzenEstimators = function countingSet(...args) {
+      builds += 1
+      return originalSet.apply(this, args)
+    }
+
+    const responses = await Promise.all(Array.from({ length: 5 }, () => client.ask(space)))
+    expect(new Set(responses.map((response) => response.number)).size).toBe(5)
+    expect(builds).toBe(1)
+  })
+
+  it('applies tells before asks within a batch', async () => {
+    const client = await startServer({ study: createTestStudy(), batchWindowMs: 50 })
+    const first = await client.ask({ x: new FloatDistribution(-5, 5) })
+
+    const originalAsk = server._ask
+    const statesSeenByAsk = []
+    server._ask = function recordingAsk(body) {
+      statesSeenByAsk.push(this.study.trials[first.number].state)
+      return originalAsk.call(this, body)
+    }
+
+    const second = client.ask({ x: new FloatDistribution(-5, 5) })
+    const told = client.tell(first.number, { value: 1.5 })
+    await Promise.all([second, told])
+
+    expect(statesSeenByAsk).toEqual([TrialState.COMPLETE])
+  })
+
+  it('restores the study from its snapshot file', async () => {
+    const snapshotPath = path.join(tmpDir, 'study.snapshot.json')
+    const client = await startServer(
+      createStudyServer({ createStudy: createTestStudy, snapshotPath, batchWindowMs: 1 })
+    )
+    for (let i = 0; i < 4; i += 1) {
+      const { number, params } = await client.ask({
+        x: new FloatDistribution(-5, 5),
+        mode: new CategoricalDistribution(['a', 'b'])
+      })
+      await client.tell(number, { value: params.x ** 2 })
+    }
+    const before = await client.snapshot()
+    await server.close()
+    server = null
+
+    const restored = createStudyServer({
+      createStudy: () => {
+        throw new Error('createStudy must not be called when a snapshot exists.')
+      },
+      snapshotPath,
+      batchWindowMs: 1
+    })
+    const restoredClient = await startServer(restored)
+    const after = await restoredClient.snapshot()
+    expect(after.trials).toEqual(before.trials)
+    expect(after.sampler).toEqual(before.sampler)
+
+    const next = await restoredClient.ask({ x: new FloatDistribution(-5, 5) })
+    expect(next.number).toBe(4)
+  })
+
+  it('rejects invalid distributions without leaving a running trial', async () => {
+    const client = await startServer({ study: createTestStudy(), batchWindowMs: 1 })
+
+    await expect(
+      client._request('POST', '/ask', { distributions: { x: { type: 'UnknownDistribution' } } })
+    ).rejects.toThrow('Unknown serialized distribution type')
+    await expect(
+      client._request('POST', '/ask', {
+        distributions: { x: { type: 'FloatDistribution', low: 2, high: 1, log: false, step: null } }
+      })
+    ).rejects.toThrow('low <= high')
+
+    const snapshot = await client.snapshot()
+    expect(snapshot.trials.length).toBe(0)
+  })
+
+  it('rejects tell states other than complete, pruned and fail', async () => {
+    const client = await startServer({ study: createTestStudy(), batchWindowMs: 1 })
+    const { number } = await client.ask({ x: new FloatDistribution(-5, 5) })
+
+    for (const state of ['bogus', TrialState.WAITING, TrialState.RUNNING]) {
+      await expect(client.tell(number, { state })).rejects.toThrow('Invalid tell state')
+    }
+    expect(trialStates(await client.snapshot())).toEqual([TrialState.RUNNING])
+
+    await client.tell(number, { state: TrialState.PRUNED })
+    expect(trialStates(await client.snapshot())).toEqual([TrialState.PRUNED])
+  })
+
+  it('fails the trial when suggesting throws after ask', async () => {
+    const client = await startServer({ study: createTestStudy(), batchWindowMs: 1 })
+    const sampler = server.study.sampler
+    sampler.sampleIndependent = () => {
+      throw new Error('sampler exploded')
+    }
+
+    await expect(client.ask({ x: new FloatDistribution(-5, 5) })).rejects.toThrow('sampler exploded')
+    expect(trialStates(await client.snapshot())).toEqual([TrialState.FAIL])
+  })
+
+  it('keeps serving when the snapshot file cannot be written', async () => {
+    const errors = []
+    const client = await startServer({
+      study: createTestStudy(),
+      snapshotPath: path.join(tmpDir, 'missing-dir', 'study.snapshot.json'),
+      batchWindowMs: 1,
+      onSnapshotError: (err) => errors.push(err)
+    })
+
+    const { number, params } = await client.ask({ x: new FloatDistribution(-5, 5) })
+    await client.tell(number, { value: params.x ** 2 })
+
+    expect(errors.length).toBeGreaterThan(0)
+    expect(server.snapshotError).toBe(errors[errors.length - 1])
+    expect(trialStates(await client.snapshot())).toEqual([TrialState.COMPLETE])
+  })
+})
@@ -0,0 +1,127 @@
+import { describe, it, expect } from 'vitest'
+import {
+  CategoricalDistribution,
+  FloatDistribution,
+  IntDistribution,
+  Study,
+  createTPESampler,
+  deserializeStudy,
+  internDistribution,
+  serializeStudy
+} from './src/optuna_tpe.js'
+import { serializeTrialForSnapshot } from './src/study/snapshotCodec.js'
+
+function runStudy(nTrials) {
+  const study = new Study({
+    sampler: createTPESampler({ seed: 3, nStartupTrials: 4 }),
+    directions: ['minimize']
+  })
+  for (let i = 0; i < nTrials; i += 1) {
+    const trial = study.ask()
+    const x = trial.suggestFloat('x', -5, 5)
+    const y = trial.suggestInt('y', 1, 9, { step: 2 })
+    const mode = trial.suggestCategorical('mode', ['a', 'b', 'c'])
+    study.tell(trial, { value: x * x + y + (mode === 'a' ? 0 : 1) })
+  }
+  return study
+}
+
+function toVersion1(snapshot, study) {
+  return {
+    ...snapshot,
+    version: 1,
+    distributions: undefined,
+    trials: study.trials.map((trial) => serializeTrialForSnapshot(trial))
+  }
+}
+
+function nextParams(study) {
+  const trial = study.ask()
+  return {
+    x: trial.suggestFloat('x', -5, 5),
+    y: trial.suggestInt('y', 1, 9, { step: 2 }),
+    mode: trial.suggestCategorical('mode', ['a', 'b', 'c'])
+  }
+}
+
+describe('study snapshots', () => {
+  it('writes version 2 with one distribution table entry per distinct distribution', () => {
+    const study = runStudy(12)
+    const snapshot = serializeStudy(study)
+
+    expect(snapshot.version).toBe(2)
+    expect(snapshot.distributions.length).toBe(3)
+    for (const trial of snapshot.trials) {
+      for (const ref of Object.values(trial.distributions)) {
+        expect(typeof ref).toBe('number')
+      }
+    }
+  })
+
+  it('shares distribution instances across trials after loading version 2', () => {
+    const restored = deserializeStudy(JSON.parse(JSON.stringify(serializeStudy(runStudy(12)))))
+    const [first, ...rest] = restored.trials
+    for (const trial of rest) {
+      for (const name of ['x', 'y', 'mode']) {
+        expect(trial.distributions[name]).toBe(first.distributions[name])
+      }
+    }
+  })
+
+  it('still loads version 1 snapshots and continues identically', () => {
+    const study = runStudy(12)
+    const snapshot = JSON.parse(JSON.stringify(serializeStudy(study)))
+    const v1 = JSON.parse(JSON.stringify(toVersion1(snapshot, study)))
+
+    const fromV1 = deserializeStudy(v1)
+    const fromV2 = deserializeStudy(snapshot)
+    expect(serializeStudy(fromV1)).toEqual(serializeStudy(fromV2))
+    expect(fromV1.trials[5].distributions.x).toBe(fromV2.trials[5].distributions.x)
+    expect(nextParams(fromV1)).toEqual(nextParams(fromV2))
+  })
+})
+
+describe('internDistribution', () => {
+  it('returns a frozen shared instance without freezing the argument', () => {
+    const choices = ['a', 'b']
+    const own = new CategoricalDistribution(choices)
+    const interned = internDistribution(own)
+
+    expect(interned).not.toBe(own)
+    expect(Object.isFrozen(own)).toBe(false)
+    expect(Object.isFrozen(own.choices)).toBe(false)
+    own.choices.push('c')
+    expect(interned.choices).toEqual(['a', 'b'])
+
+    expect(Object.isFrozen(interned)).toBe(true)
+    expect(internDistribution(new CategoricalDistribution(['a', 'b']))).toBe(interned)
+    expect(internDistribution(interned)).toBe(interned)
+  })
+
+  it('copies stepped floats without re-adjusting high', () => {
+    const own = new FloatDistribution(4.33, 11.75, false, 0.26)
+    const interned = internDistribution(own)
+    expect(interned.high).toBe(own.high)
+    expect(interned.equals(own)).toBe(true)
+
+    const study = new Study({
+      sampler: createTPESampler({ seed: 0 }),
+      directions: ['minimize']
+    })
+    const trial = study.ask()
+    const x = trial.suggestFloat('x', 4.33, 11.75, { step: 0.26 })
+    const distribution = trial.frozen.distributions.x
+    expect(distribution).toBe(interned)
+    expect(distribution.high).toBe(new FloatDistribution(4.33, 11.75, false, 0.26).high)
+    expect(x).toBeLessThanOrEqual(distribution.high)
+  })
+
+  it('interns numeric distributions by value', () => {
+    const a = internDistribution(new FloatDistribution(0, 1, false, 0.25))
+    const b = internDistribution(new FloatDistribution(0, 1, false, 0.25))
+    const c = internDistribution(new IntDistribution(0, 1))
+    expect(a).toBe(b)
+    expect(a).not.toBe(c)
+    expect(a.equals(new FloatDistribution(0, 1, false, 0.25))).toBe(true)
+  })
+})